@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmarks offline dos scripts de tags OCI.
+
+    python benchmark.py registry --resources 200000
+    python benchmark.py rules --resources 200000 --rules 24
+    python benchmark.py scale --compartments 500 --resources 100000 --workers 4,16,32
+
+registry: compara o custo por recurso do despacho via registro declarativo
+(resource_registry) com a cadeia if/elif original, usando clientes falsos que devolvem
+páginas pré-montadas. As duas formas rodam alternadas em várias rodadas e o resultado é a
+mediana com a faixa (mínimo-máximo) de cada uma; a linha "listagem =" compara com a cadeia
+if/elif montando o mesmo dicionário. Sem rede, a diferença é o overhead do registro (busca
+do tipo e chamadas indiretas), que aparece inteiro aqui.
+
+rules: avalia N regras de tag sobre um inventário sintético com o TagMatcher compilado
+(uma passada) e com uma passada por regra, como seria preciso com _has_target_tag.
+
+scale: roda o OCITagScanner e o OCITagRemover de verdade contra o backend falso de
+fake_oci.py (latência, paginação, rate limit e falhas configuráveis) e mede, para cada
+número de workers, o tempo de varredura e as chamadas à API, a mesma descoberta via
+Resource Search e, para cada limite de concorrência, a vazão das remoções.
+"""
+
+import copy
+import statistics
+import time
+import types
+from typing import Any, Callable, Dict, List
+
+import click
+import oci
+
+from fake_oci import FakeBackend, FakeTenancy
+from region_fanout import fan_out
+from removal_executor import RemovalExecutor
+from resource_registry import DEFAULT_RESOURCE_TYPES, get_resource_type, parse_resource_types
+from scan_engine import ScanEngine
+from tag_rules import TagMatcher
+
+
+class _Response:
+    def __init__(self, data: List[Any]):
+        self.data = data
+        self.has_next_page = False
+        self.next_page = None
+
+
+class _InstantClient:
+    """Cliente falso: list_* devolve a mesma página pré-montada, update_* não faz nada."""
+
+    def __init__(self, items: List[Any]):
+        self._response = _Response(items)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("list_"):
+            return lambda **kwargs: self._response
+        return lambda **kwargs: None
+
+
+def _make_items(count: int) -> List[Any]:
+    tags = {"finops": {"customer": "seduc-go"}}
+    return [
+        # Os modelos do SDK sempre expõem freeform_tags (None quando vazio)
+        types.SimpleNamespace(id=f"ocid1.fake..{i}", display_name=f"r{i}", db_name=f"db{i}",
+                              lifecycle_state="AVAILABLE", defined_tags=tags, freeform_tags=None)
+        for i in range(count)
+    ]
+
+
+def _has_target_tag(defined_tags: Dict, namespace: str, key: str, value: str) -> bool:
+    if not defined_tags:
+        return False
+    return (namespace in defined_tags and
+            key in defined_tags[namespace] and
+            defined_tags[namespace][key] == value)
+
+
+class _Owner:
+    """Faz o papel do OCITagScanner/OCITagRemover: um atributo por cliente."""
+
+    def __init__(self, client: Any):
+        for attr in ("compute_client", "blockstorage_client", "network_client", "loadbalancer_client", "database_client"):
+            setattr(self, attr, client)
+
+
+def legacy_find(owner: _Owner, compartment_id: str, resource_type: str) -> List[Dict[str, Any]]:
+    """Cópia fiel da cadeia if/elif anterior ao registro (referência do benchmark)."""
+    if resource_type == "Instance":
+        items = owner.compute_client.list_instances(compartment_id=compartment_id).data
+    elif resource_type == "Volume":
+        items = owner.blockstorage_client.list_volumes(compartment_id=compartment_id).data
+    elif resource_type == "VCN":
+        items = owner.network_client.list_vcns(compartment_id=compartment_id).data
+    elif resource_type == "Subnet":
+        items = owner.network_client.list_subnets(compartment_id=compartment_id).data
+    elif resource_type == "Load Balancer":
+        items = owner.loadbalancer_client.list_load_balancers(compartment_id=compartment_id).data
+    else:
+        items = owner.database_client.list_databases(compartment_id=compartment_id).data
+    resources = []
+    for item in items:
+        if _has_target_tag(item.defined_tags, "finops", "customer", "seduc-go"):
+            resources.append({
+                "type": resource_type,
+                "id": item.id,
+                "name": item.db_name if resource_type == "Database" else item.display_name,
+                "lifecycle_state": item.lifecycle_state,
+                "compartment_id": compartment_id,
+                "defined_tags": item.defined_tags
+            })
+    return resources
+
+
+def legacy_find_same_dict(owner: _Owner, compartment_id: str, resource_type: str) -> List[Dict[str, Any]]:
+    """
+    Cadeia if/elif montando o mesmo dicionário que o to_resource (region, freeform_tags e
+    identity), para comparar o despacho em si e não o tamanho do resultado.
+    """
+    if resource_type == "Instance":
+        items = owner.compute_client.list_instances(compartment_id=compartment_id).data
+    elif resource_type == "Volume":
+        items = owner.blockstorage_client.list_volumes(compartment_id=compartment_id).data
+    elif resource_type == "VCN":
+        items = owner.network_client.list_vcns(compartment_id=compartment_id).data
+    elif resource_type == "Subnet":
+        items = owner.network_client.list_subnets(compartment_id=compartment_id).data
+    elif resource_type == "Load Balancer":
+        items = owner.loadbalancer_client.list_load_balancers(compartment_id=compartment_id).data
+    else:
+        items = owner.database_client.list_databases(compartment_id=compartment_id).data
+    resources = []
+    for item in items:
+        if _has_target_tag(item.defined_tags, "finops", "customer", "seduc-go"):
+            resources.append({
+                "type": resource_type,
+                "id": item.id,
+                "name": item.db_name if resource_type == "Database" else item.display_name,
+                "lifecycle_state": item.lifecycle_state or "-",
+                "compartment_id": compartment_id,
+                "region": None,
+                "defined_tags": item.defined_tags,
+                "freeform_tags": item.freeform_tags,
+                "identity": None
+            })
+    return resources
+
+
+def legacy_update(owner: _Owner, resource: Dict[str, Any], tags: Dict[str, Any]):
+    resource_type = resource["type"]
+    if resource_type == "Instance":
+        owner.compute_client.update_instance(
+            instance_id=resource["id"],
+            update_instance_details=oci.core.models.UpdateInstanceDetails(defined_tags=tags))
+    elif resource_type == "Volume":
+        owner.blockstorage_client.update_volume(
+            volume_id=resource["id"],
+            update_volume_details=oci.core.models.UpdateVolumeDetails(defined_tags=tags))
+    elif resource_type == "VCN":
+        owner.network_client.update_vcn(
+            vcn_id=resource["id"],
+            update_vcn_details=oci.core.models.UpdateVcnDetails(defined_tags=tags))
+    elif resource_type == "Subnet":
+        owner.network_client.update_subnet(
+            subnet_id=resource["id"],
+            update_subnet_details=oci.core.models.UpdateSubnetDetails(defined_tags=tags))
+    elif resource_type == "Load Balancer":
+        owner.loadbalancer_client.update_load_balancer(
+            load_balancer_id=resource["id"],
+            update_load_balancer_details=oci.load_balancer.models.UpdateLoadBalancerDetails(defined_tags=tags))
+    else:
+        owner.database_client.update_database(
+            database_id=resource["id"],
+            update_database_details=oci.database.models.UpdateDatabaseDetails(defined_tags=tags))
+
+
+def registry_find(owner: _Owner, compartment_id: str, resource_type: str) -> List[Dict[str, Any]]:
+    """Mesmo laço do find_resources_of_type dos scripts, sem paginação nem rede."""
+    rt = get_resource_type(resource_type)
+    items = getattr(getattr(owner, rt.client), rt.list_method)(**rt.list_call_kwargs(owner, compartment_id)).data
+    resources = []
+    for item in items:
+        if _has_target_tag(item.defined_tags, "finops", "customer", "seduc-go"):
+            resources.append(rt.to_resource(item, compartment_id))
+    return resources
+
+
+def registry_update(owner: _Owner, resource: Dict[str, Any], tags: Dict[str, Any]):
+    rt = get_resource_type(resource["type"])
+    rt.update(getattr(owner, rt.client), resource, tags)
+
+
+def _samples_ns(fns: List[Callable[[], int]], repeat: int) -> List[List[float]]:
+    """
+    ns por recurso de cada fn em `repeat` rodadas. As fns rodam alternadas dentro de cada
+    rodada, para que variações da máquina (frequência da CPU, outros processos) afetem todas.
+    """
+    samples: List[List[float]] = [[] for _ in fns]
+    for _ in range(repeat):
+        for fn, times in zip(fns, samples):
+            start = time.perf_counter()
+            processed = fn()
+            times.append((time.perf_counter() - start) / processed * 1e9)
+    return samples
+
+
+def _median_range(samples: List[float]) -> str:
+    return f"{statistics.median(samples):.0f} ({min(samples):.0f}-{max(samples):.0f})"
+
+
+def _per_resource_ns(fn: Callable[[], int], repeat: int) -> float:
+    """Melhor tempo (ns por recurso) entre `repeat` execuções de fn, que devolve quantos recursos processou."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processed = fn()
+        best = min(best, (time.perf_counter() - start) / processed * 1e9)
+    return best
+
+
+@click.group()
+def cli():
+    """Benchmarks offline dos scripts de tags."""
+
+
+@cli.command()
+@click.option("--resources", default=100000, show_default=True, help="Recursos por tipo em cada rodada.")
+@click.option("--repeat", default=15, show_default=True, help="Rodadas alternadas por medição (vale a mediana).")
+def registry(resources: int, repeat: int):
+    """Overhead por recurso do registro declarativo vs. cadeia if/elif."""
+    owner = _Owner(_InstantClient(_make_items(resources)))
+    tags = {"outro": {"chave": "valor"}}
+    sample = {rtype: legacy_find(owner, "c", rtype) for rtype in DEFAULT_RESOURCE_TYPES}
+
+    def run_find(find: Callable) -> Callable[[], int]:
+        return lambda: sum(len(find(owner, "c", rtype)) for rtype in DEFAULT_RESOURCE_TYPES)
+
+    def run_update(update: Callable) -> Callable[[], int]:
+        def run() -> int:
+            count = 0
+            for found in sample.values():
+                for resource in found:
+                    update(owner, resource, tags)
+                    count += 1
+            return count
+        return run
+
+    for rtype in DEFAULT_RESOURCE_TYPES:
+        assert legacy_find_same_dict(owner, "c", rtype) == registry_find(owner, "c", rtype), rtype
+
+    # "listagem" compara com a cópia fiel do código antigo, que monta um dicionário menor;
+    # "listagem =" compara as duas formas produzindo exatamente o mesmo dicionário
+    print(f"ns/recurso: mediana (mínimo-máximo) de {repeat} rodadas alternadas")
+    print(f"{'etapa':<14}{'if/elif':>20}{'registro':>20}{'diferença':>22}")
+    for label, legacy, new in (("listagem", run_find(legacy_find), run_find(registry_find)),
+                               ("listagem =", run_find(legacy_find_same_dict), run_find(registry_find)),
+                               ("update", run_update(legacy_update), run_update(registry_update))):
+        legacy_ns, new_ns = _samples_ns([legacy, new], repeat)
+        legacy_median, new_median = statistics.median(legacy_ns), statistics.median(new_ns)
+        diff = f"{new_median - legacy_median:+.0f} ns ({(new_median - legacy_median) / legacy_median:+.1%})"
+        print(f"{label:<14}{_median_range(legacy_ns):>20}{_median_range(new_ns):>20}{diff:>22}")
+
+
+@cli.command()
+@click.option("--resources", default=100000, show_default=True, help="Recursos no inventário sintético.")
+@click.option("--rules", "rule_count", default=24, show_default=True, help="Quantidade de regras exatas (clientes distintos).")
+@click.option("--repeat", default=3, show_default=True, help="Rodadas por medição (vale a melhor).")
+def rules(resources: int, rule_count: int, repeat: int):
+    """Uma passada com o TagMatcher vs. uma passada por regra."""
+    customers = [f"cliente-{i}" for i in range(rule_count)]
+    inventory = [{"finops": {"customer": customers[i % rule_count], "cost-center": str(i % 7)}} for i in range(resources)]
+    matcher = TagMatcher.parse([f"finops.customer={customer}" for customer in customers])
+
+    def per_rule() -> int:
+        for customer in customers:
+            sum(1 for tags in inventory if _has_target_tag(tags, "finops", "customer", customer))
+        return len(inventory)
+
+    def compiled() -> int:
+        sum(1 for tags in inventory if matcher.match(tags))
+        return len(inventory)
+
+    per_rule_ns = _per_resource_ns(per_rule, repeat)
+    compiled_ns = _per_resource_ns(compiled, repeat)
+    print(f"{rule_count} regras, {resources} recursos")
+    print(f"  uma passada por regra: {per_rule_ns:>8.0f} ns/recurso")
+    print(f"  TagMatcher compilado:  {compiled_ns:>8.0f} ns/recurso ({per_rule_ns / compiled_ns:.1f}x)")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+@cli.command()
+@click.option("--compartments", default=500, show_default=True, help="Compartimentos na tenancy sintética.")
+@click.option("--resources", default=100000, show_default=True, help="Recursos no total (todas as regiões).")
+@click.option("--regions", "region_count", default=1, show_default=True, help="Regiões assinadas.")
+@click.option("--types", "types_spec", default="default", show_default=True, help="Tipos de recurso (como em --types).")
+@click.option("--tagged", default=0.1, show_default=True, help="Fração dos recursos com a tag alvo.")
+@click.option("--latency", default=0.02, show_default=True, help="Latência simulada por chamada, em segundos.")
+@click.option("--page-size", default=100, show_default=True, help="Itens por página nas listagens.")
+@click.option("--rate-limit", default=0.0, show_default=True, help="Chamadas/s aceitas antes de responder 429 (0 = sem limite).")
+@click.option("--failure-rate", default=0.0, show_default=True, help="Probabilidade de HTTP 500 em cada chamada.")
+@click.option("--workers", "workers_spec", default="4,16,32", show_default=True, help="Workers da varredura a medir.")
+@click.option("--concurrency", "concurrency_spec", default="4,16,32", show_default=True,
+              help="Limites de concorrência da remoção a medir.")
+@click.option("--removals", default=2000, show_default=True, help="Recursos removidos em cada medição (0 = todos os encontrados).")
+def scale(compartments: int, resources: int, region_count: int, types_spec: str, tagged: float, latency: float,
+          page_size: int, rate_limit: float, failure_rate: float, workers_spec: str, concurrency_spec: str, removals: int):
+    """Varredura e remoção em escala contra o backend OCI falso."""
+    from delete_tags import OCITagRemover
+    from dry_run import OCITagScanner
+
+    resource_types = parse_resource_types(types_spec)
+    regions = tuple(f"fake-region-{i + 1}" for i in range(region_count))
+    start = time.perf_counter()
+    tenancy = FakeTenancy(compartments, resources, regions, resource_types, tagged_ratio=tagged)
+    backend = FakeBackend(tenancy, latency=latency, page_size=page_size, rate_limit=rate_limit, failure_rate=failure_rate)
+    print(f"tenancy sintética: {compartments} compartimentos, {resources} recursos ({tenancy.tagged} com a tag), "
+          f"{region_count} região(ões), gerada em {time.perf_counter() - start:.1f}s")
+    print(f"backend: latência {latency * 1000:.0f} ms, {page_size} itens/página, rate limit "
+          f"{rate_limit or 'nenhum'}, falhas {failure_rate:.1%}")
+
+    scanner = OCITagScanner(config=backend.config(), factories=backend.factories())
+    remover = OCITagRemover(config=backend.config(), factories=backend.factories())
+
+    found: List[Dict[str, Any]] = []
+    print(f"\n{'workers':>8}{'varredura (s)':>15}{'chamadas':>10}{'páginas':>9}{'chamadas/s':>12}"
+          f"{'429':>7}{'retries SDK':>13}{'erros':>7}{'encontrados':>13}")
+    for workers in _int_list(workers_spec):
+        backend.reset_counters()
+        errors = []
+        start = time.perf_counter()
+        scan_compartments = scanner.get_compartments()
+
+        def scan_region(region: str) -> List[Dict[str, Any]]:
+            engine = ScanEngine(scanner.in_region(region).find_resources_of_type, max_workers=workers,
+                                on_error=lambda comp_id, rtype, e: errors.append(e))
+            results = engine.scan(scan_compartments, resource_types)
+            return [resource for comp in scan_compartments for resource in results[comp["id"]]]
+
+        found = [resource for result in fan_out(list(regions), scan_region) for resource in result.value or []]
+        elapsed = time.perf_counter() - start
+        pages = sum(count for operation, count in backend.calls.items() if operation.startswith("list_"))
+        print(f"{workers:>8}{elapsed:>15.2f}{backend.total_calls:>10}{pages:>9}{backend.total_calls / elapsed:>12.0f}"
+              f"{backend.throttled:>7}{backend.sdk_retries:>13}{len(errors):>7}{len(found):>13}")
+
+    # Mesma descoberta pelo Resource Search (search_client do backend falso), uma consulta por região
+    backend.reset_counters()
+    start = time.perf_counter()
+    searched = fan_out(list(regions), lambda region: list(
+        scanner.in_region(region).find_resources_via_search().find_resources_with_tag(resource_types=resource_types)))
+    searched_count = sum(len(result.value or []) for result in searched)
+    print(f"\nResource Search: {searched_count} encontrados (tipos com search_type) em "
+          f"{time.perf_counter() - start:.2f}s, {backend.total_calls} chamadas")
+
+    sample = found[:removals] if removals else found
+    print(f"\nremoção de {len(sample)} recursos (get + update por recurso)")
+    print(f"{'concorrência':>13}{'tempo (s)':>11}{'updates/s':>11}{'chamadas':>10}{'429':>7}{'retries':>9}"
+          f"{'conc. final/pico':>18}{'falhas':>8}")
+    for concurrency in _int_list(concurrency_spec):
+        tenancy.reset_tags()
+        backend.reset_counters()
+        executor = RemovalExecutor(remover.update_resource_tags, max_concurrency=concurrency)
+        stats = executor.run(copy.deepcopy(sample))
+        print(f"{concurrency:>13}{stats.wall_time:>11.2f}{stats.updates_per_second:>11.1f}{backend.total_calls:>10}"
+              f"{backend.throttled:>7}{stats.retries:>9}{f'{stats.final_concurrency}/{stats.peak_concurrency}':>18}"
+              f"{stats.failed:>8}")
+
+
+if __name__ == "__main__":
+    cli()
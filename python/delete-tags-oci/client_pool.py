@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Pool de clientes OCI criados sob demanda.
+
+O SDK não documenta os clientes de serviço como thread-safe (cada um mantém sua própria
+sessão HTTP), então o pool guarda um cliente por (serviço, região) em cada thread. As threads
+são as dos ThreadPoolExecutor do ScanEngine, do RemovalExecutor e do fan-out por região, que
+são reaproveitadas: o total de clientes fica limitado a workers × serviços usados × regiões.
+Nenhum cliente é criado na inicialização: o primeiro acesso a `compute_client`,
+`database_client` etc. em uma thread constrói o cliente daquele serviço e os acessos seguintes
+o reaproveitam. Serviços que a execução não usa (ex.: Object Storage sem buckets em --types)
+nunca são instanciados.
+
+A chave privada é carregada uma única vez: todos os clientes compartilham o mesmo Signer
+(assinar uma requisição não altera o estado dele), o que reduz a criação de cada cliente
+de dezenas de milissegundos para menos de um.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import oci
+
+# Atributo usado pelos scripts e pelo resource_registry -> classe do cliente
+CLIENT_FACTORIES: "OrderedDict[str, Callable[..., Any]]" = OrderedDict([
+    ("identity_client", oci.identity.IdentityClient),
+    ("compute_client", oci.core.ComputeClient),
+    ("network_client", oci.core.VirtualNetworkClient),
+    ("blockstorage_client", oci.core.BlockstorageClient),
+    ("database_client", oci.database.DatabaseClient),
+    ("loadbalancer_client", oci.load_balancer.LoadBalancerClient),
+    ("objectstorage_client", oci.object_storage.ObjectStorageClient),
+    ("containerengine_client", oci.container_engine.ContainerEngineClient),
+    ("search_client", oci.resource_search.ResourceSearchClient),
+])
+
+class ClientPool:
+    """Clientes OCI por (serviço, região, thread), criados no primeiro uso."""
+
+    def __init__(self, config: Dict[str, Any], factories: Optional[Dict[str, Callable[..., Any]]] = None):
+        self.config = config
+        self.factories = factories if factories is not None else CLIENT_FACTORIES
+        # Cada região tem o seu threading.local: {serviço: cliente} da thread atual
+        self._regions: Dict[Optional[str], threading.local] = {}
+        self._lock = threading.Lock()
+        self.created: Dict[str, int] = {}
+        self.build_time = 0.0
+        self._signer = None
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        # Perfis com security token (oci session authenticate) ficam com a autenticação padrão do SDK
+        if "security_token_file" in self.config:
+            return {}
+        with self._lock:
+            if self._signer is None:
+                self._signer = oci.signer.Signer.from_config(self.config)
+        return {"signer": self._signer}
+
+    def _thread_clients(self, region: Optional[str]) -> Dict[str, Any]:
+        local = self._regions.get(region)
+        if local is None:
+            with self._lock:
+                local = self._regions.setdefault(region, threading.local())
+        clients = getattr(local, "clients", None)
+        if clients is None:
+            clients = local.clients = {}
+        return clients
+
+    def get(self, name: str, region: Optional[str] = None) -> Any:
+        region = region or self.config.get("region")
+        clients = self._thread_clients(region)
+        client = clients.get(name)
+        if client is None:
+            config = self.config if region == self.config.get("region") else dict(self.config, region=region)
+            start = time.perf_counter()
+            client = self.factories[name](config, **self._client_kwargs())
+            elapsed = time.perf_counter() - start
+            clients[name] = client
+            with self._lock:
+                self.created[name] = self.created.get(name, 0) + 1
+                self.build_time += elapsed
+        return client
+
+    def summary(self) -> str:
+        total = sum(self.created.values())
+        if not total:
+            return "nenhum cliente criado"
+        services = ", ".join(f"{name[:-len('_client')]}×{count}" for name, count in self.created.items())
+        return f"{total} clientes criados em {self.build_time:.2f}s ({services})"
+
+
+class LazyClients:
+    """
+    Base do OCITagScanner/OCITagRemover: resolve os atributos `*_client` pelo ClientPool
+    em `self.clients`, na região `self.region` (None = região do config). Atributos
+    definidos diretamente na instância têm precedência.
+    """
+
+    region: Optional[str] = None
+
+    def in_region(self, region: str) -> "LazyClients":
+        """Cópia rasa que usa os clientes de outra região (pool, config e estatísticas são compartilhados)."""
+        view = copy.copy(self)
+        view.region = region
+        return view
+
+    def client(self, name: str, region: Optional[str] = None) -> Any:
+        """Cliente do serviço `name` em `region` (padrão: a região desta instância)."""
+        return self.clients.get(name, region or self.region)
+
+    def __getattr__(self, name: str) -> Any:
+        # __getattr__ só é chamado quando o atributo não existe na instância nem na classe
+        clients = self.__dict__.get("clients")
+        if clients is not None and name in clients.factories:
+            return clients.get(name, self.region)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
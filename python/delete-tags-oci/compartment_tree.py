@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Árvore de compartimentos da tenancy, com filtros por caminho.
+
+A árvore inteira vem de uma única listagem paginada com compartment_id_in_subtree a partir
+da raiz. Se o usuário não puder listar a subárvore da raiz, a árvore é percorrida nível a
+nível, com os filhos de todos os compartimentos de um nível listados em paralelo.
+Compartimentos que não estão ACTIVE (DELETED, DELETING, CREATING, INACTIVE) ficam de fora,
+junto com toda a subárvore abaixo deles.
+
+Cada compartimento recebe um caminho relativo à raiz ("prod/app"; a raiz é ""). Os filtros
+--include/--exclude são globs sobre esse caminho (sem diferenciar maiúsculas) e valem para
+a subárvore inteira: "--include prod" seleciona prod e todos os descendentes, "--exclude
+prod/legacy*" descarta legacy e o que estiver abaixo.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Tuple
+
+import oci
+
+from pagination import PageStats, paginate
+
+ROOT_NAME = "Root Compartment"
+
+
+def _list_children(owner: Any, compartment_id: str, page_stats: Optional[PageStats], **kwargs) -> List[Any]:
+    # owner.identity_client é resolvido pelo ClientPool na thread que executa a listagem
+    return list(paginate(owner.identity_client.list_compartments, compartment_id=compartment_id,
+                         access_level="ACCESSIBLE", label="Compartment", stats=page_stats, **kwargs))
+
+
+def list_by_level(owner: Any, tenancy_id: str, page_stats: Optional[PageStats] = None, workers: int = 8) -> List[Any]:
+    """Percorre a árvore em largura; os compartimentos de cada nível são listados em paralelo."""
+    found: List[Any] = []
+    level = [tenancy_id]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while level:
+            children = list(executor.map(lambda comp_id: _list_children(owner, comp_id, page_stats), level))
+            # Subárvores de compartimentos inativos não são visitadas
+            level = [comp.id for comps in children for comp in comps if comp.lifecycle_state == "ACTIVE"]
+            found.extend(comp for comps in children for comp in comps)
+    return found
+
+
+def list_compartment_tree(owner: Any, tenancy_id: str, page_stats: Optional[PageStats] = None, workers: int = 8) -> List[Any]:
+    """Todos os compartimentos abaixo da raiz (CompartmentSummary), em qualquer estado."""
+    try:
+        return _list_children(owner, tenancy_id, page_stats, compartment_id_in_subtree=True)
+    except oci.exceptions.ServiceError as e:
+        if e.status not in (401, 403, 404):
+            raise
+        return list_by_level(owner, tenancy_id, page_stats, workers)
+
+
+def build_tree(tenancy_id: str, summaries: List[Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Monta a lista de compartimentos ativos ({id, name, parent_id, path}), com a raiz primeiro
+    e os demais em ordem de caminho. Retorna também quantos foram descartados por estarem
+    inativos ou abaixo de um compartimento inativo.
+    """
+    active = {comp.id: comp for comp in summaries if comp.lifecycle_state == "ACTIVE"}
+    paths: Dict[str, Optional[str]] = {tenancy_id: ""}
+
+    def path_of(comp_id: str) -> Optional[str]:
+        if comp_id in paths:
+            return paths[comp_id]
+        chain = []
+        current = comp_id
+        while current not in paths:
+            comp = active.get(current)
+            if comp is None or current in chain:
+                # Ancestral inativo (ou fora do alcance da listagem): a subárvore é descartada
+                for pending in chain:
+                    paths[pending] = None
+                return None
+            chain.append(current)
+            current = comp.compartment_id
+        for pending in reversed(chain):
+            parent_path = paths[active[pending].compartment_id]
+            paths[pending] = None if parent_path is None else "/".join(p for p in (parent_path, active[pending].name) if p)
+        return paths[comp_id]
+
+    compartments = [{"id": tenancy_id, "name": ROOT_NAME, "parent_id": None, "path": ""}]
+    for comp in active.values():
+        path = path_of(comp.id)
+        if path is not None:
+            compartments.append({"id": comp.id, "name": comp.name, "parent_id": comp.compartment_id, "path": path})
+    compartments[1:] = sorted(compartments[1:], key=lambda comp: comp["path"].lower())
+    return compartments, len(summaries) - (len(compartments) - 1)
+
+
+class CompartmentFilter:
+    """Seleção de subárvores por globs de caminho (--include / --exclude)."""
+
+    def __init__(self, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+        self.include = [self._normalize(p) for p in include or []]
+        self.exclude = [self._normalize(p) for p in exclude or []]
+
+    @staticmethod
+    def _normalize(pattern: str) -> str:
+        return pattern.strip().strip("/").lower()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    @staticmethod
+    def _lineage(path: str) -> List[str]:
+        """O próprio caminho e os de todos os ancestrais (exceto a raiz)."""
+        parts = path.lower().split("/") if path else []
+        return ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+    def _any_match(self, patterns: List[str], lineage: List[str]) -> bool:
+        return any(fnmatchcase(path, pattern) for pattern in patterns for path in lineage)
+
+    def matches(self, compartment: Dict[str, Any]) -> bool:
+        lineage = self._lineage(compartment.get("path") or "")
+        if not lineage:
+            # A raiz só entra na varredura sem --include ou com um include que case com ""
+            lineage = [""]
+        if self.include and not self._any_match(self.include, lineage):
+            return False
+        return not self._any_match(self.exclude, lineage)
+
+    def apply(self, compartments: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Compartimentos selecionados e quantos foram descartados pelos filtros."""
+        if not self.active:
+            return compartments, 0
+        kept = [comp for comp in compartments if self.matches(comp)]
+        return kept, len(compartments) - len(kept)
@@ -9,39 +9,71 @@ from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
+import copy
 import sys
-from typing import List, Dict, Any
 import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from pagination import PageStats, paginate
+from region_fanout import fan_out, resolve_regions, subscribed_regions
+from client_pool import ClientPool, LazyClients
+from compartment_tree import CompartmentFilter, build_tree, list_compartment_tree
+from inventory_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL_HOURS, InventoryCache, tag_filter_key
+from journal import DEFAULT_JOURNAL_PATH, RemovalJournal
+from removal_executor import DEFAULT_MAX_CONCURRENCY, RemovalExecutor
+from resource_registry import DEFAULT_RESOURCE_TYPES, get_resource_type, parse_resource_types
+from scan_engine import DEFAULT_WORKERS, ScanEngine
+from tag_rules import DEFAULT_RULE
+from verification import (DEFAULT_ATTEMPTS, DEFAULT_DELAY, DEFAULT_REPORT_PATH, CONFIRMED, ERROR, GONE,
+                          STILL_TAGGED, TagVerifier, describe_error, write_report)
 
 console = Console()
 
-class OCITagRemover:
-    def __init__(self, config_path: str = "~/.oci/config"):
-        """Inicializa o cliente OCI com configuração."""
+def report_scan_error(compartment_id: str, resource_type: str, error: Exception, region: Optional[str] = None):
+    """Aviso padrão para unidades (compartimento, tipo) que falharam na listagem."""
+    where = f"no compartimento {compartment_id}" + (f" ({region})" if region else "")
+    console.print(f"[yellow]Aviso: Erro ao listar {resource_type} {where}: {error}[/yellow]")
+
+class OCITagRemover(LazyClients):
+    def __init__(self, config_path: str = "~/.oci/config", config: Optional[Dict[str, Any]] = None,
+                 factories: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa o cliente OCI com configuração. config e factories substituem o arquivo
+        de configuração e as classes do SDK (usados pelo backend falso do benchmark scale).
+        """
+        start = time.perf_counter()
         try:
-            self.config = oci.config.from_file(config_path)
-            self.identity_client = oci.identity.IdentityClient(self.config)
-            self.compute_client = oci.core.ComputeClient(self.config)
-            self.network_client = oci.core.VirtualNetworkClient(self.config)
-            self.blockstorage_client = oci.core.BlockstorageClient(self.config)
-            self.database_client = oci.database.DatabaseClient(self.config)
-            self.loadbalancer_client = oci.load_balancer.LoadBalancerClient(self.config)
-            self.objectstorage_client = oci.object_storage.ObjectStorageClient(self.config)
-            console.print(f"[green]✓[/green] Conectado à OCI usando configuração: {config_path}")
+            self.config = config if config is not None else oci.config.from_file(config_path)
+            self.page_stats = PageStats()
+            self.clients = ClientPool(self.config, factories)
+            self.region = self.config.get("region")
+            self.inactive_compartments = 0
+            self._object_storage_namespace = None
+            # Os clientes de cada serviço são criados no primeiro uso (client_pool.py)
+            self.startup_time = time.perf_counter() - start
+            console.print(f"[green]✓[/green] Conectado à OCI usando configuração: {config_path if config is None else 'em memória'} "
+                          f"(inicialização: {self.startup_time * 1000:.0f} ms)")
         except Exception as e:
             console.print(f"[red]✗[/red] Erro ao conectar à OCI: {e}")
             sys.exit(1)
 
+    @property
+    def object_storage_namespace(self) -> str:
+        """Namespace do Object Storage da tenancy (necessário para listar buckets)."""
+        if self._object_storage_namespace is None:
+            self._object_storage_namespace = self.objectstorage_client.get_namespace().data
+        return self._object_storage_namespace
+
+    def subscribed_regions(self) -> List[str]:
+        """Regiões assinadas pela tenancy (usadas por --regions all)."""
+        return subscribed_regions(self.identity_client, self.config['tenancy'])
+
     def get_compartments(self) -> List[Dict[str, Any]]:
-        """Obtém todos os compartimentos acessíveis."""
+        """Obtém a árvore de compartimentos ativos (com o caminho de cada um a partir da raiz)."""
         try:
-            response = self.identity_client.list_compartments(
-                compartment_id=self.config['tenancy'],
-                access_level="ACCESSIBLE"
-            )
-            compartments = [{"id": self.config['tenancy'], "name": "Root Compartment"}] + [
-                {"id": comp.id, "name": comp.name} for comp in response.data
-            ]
+            summaries = list_compartment_tree(self, self.config['tenancy'], self.page_stats)
+            compartments, self.inactive_compartments = build_tree(self.config['tenancy'], summaries)
             return compartments
         except Exception as e:
             console.print(f"[red]Erro ao listar compartimentos: {e}[/red]")
@@ -50,97 +82,37 @@ class OCITagRemover:
     def find_resources_with_tag(self, compartment_id: str, tag_namespace: str = "finops", tag_key: str = "customer", tag_value: str = "seduc-go") -> List[Dict[str, Any]]:
         """Encontra todos os recursos com a tag específica."""
         resources = []
-        
-        # Instâncias de computação
-        try:
-            instances = self.compute_client.list_instances(compartment_id=compartment_id).data
-            for instance in instances:
-                if self._has_target_tag(instance.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Instance",
-                        "id": instance.id,
-                        "name": instance.display_name,
-                        "lifecycle_state": instance.lifecycle_state,
-                        "defined_tags": instance.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar instâncias: {e}[/yellow]")
-
-        # Volumes de bloco
-        try:
-            volumes = self.blockstorage_client.list_volumes(compartment_id=compartment_id).data
-            for volume in volumes:
-                if self._has_target_tag(volume.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Volume",
-                        "id": volume.id,
-                        "name": volume.display_name,
-                        "lifecycle_state": volume.lifecycle_state,
-                        "defined_tags": volume.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar volumes: {e}[/yellow]")
-
-        # VCNs
-        try:
-            vcns = self.network_client.list_vcns(compartment_id=compartment_id).data
-            for vcn in vcns:
-                if self._has_target_tag(vcn.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "VCN",
-                        "id": vcn.id,
-                        "name": vcn.display_name,
-                        "lifecycle_state": vcn.lifecycle_state,
-                        "defined_tags": vcn.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar VCNs: {e}[/yellow]")
+        for resource_type in DEFAULT_RESOURCE_TYPES:
+            try:
+                resources.extend(self.find_resources_of_type(compartment_id, resource_type, tag_namespace, tag_key, tag_value))
+            except Exception as e:
+                report_scan_error(compartment_id, resource_type, e)
+        return resources
 
-        # Subnets
-        try:
-            subnets = self.network_client.list_subnets(compartment_id=compartment_id).data
-            for subnet in subnets:
-                if self._has_target_tag(subnet.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Subnet",
-                        "id": subnet.id,
-                        "name": subnet.display_name,
-                        "lifecycle_state": subnet.lifecycle_state,
-                        "defined_tags": subnet.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar subnets: {e}[/yellow]")
+    def find_resources_of_type(self, compartment_id: str, resource_type: str, tag_namespace: str = "finops", tag_key: str = "customer", tag_value: str = "seduc-go", created_after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Encontra os recursos de um único tipo com a tag específica (unidade de trabalho do ScanEngine).
 
-        # Load Balancers
-        try:
-            load_balancers = self.loadbalancer_client.list_load_balancers(compartment_id=compartment_id).data
-            for lb in load_balancers:
-                if self._has_target_tag(lb.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Load Balancer",
-                        "id": lb.id,
-                        "name": lb.display_name,
-                        "lifecycle_state": lb.lifecycle_state,
-                        "defined_tags": lb.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar load balancers: {e}[/yellow]")
+        Erros de API são propagados (o ScanEngine os contabiliza e reporta).
 
-        # Databases
-        try:
-            databases = self.database_client.list_databases(compartment_id=compartment_id).data
-            for db in databases:
-                if self._has_target_tag(db.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Database",
-                        "id": db.id,
-                        "name": db.db_name,
-                        "lifecycle_state": db.lifecycle_state,
-                        "defined_tags": db.defined_tags
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar databases: {e}[/yellow]")
+        Com created_after, a listagem é ordenada por data de criação decrescente e a paginação
+        para no primeiro recurso criado até esse instante (varredura incremental).
+        """
+        rt = get_resource_type(resource_type)
+        list_fn = getattr(getattr(self, rt.client), rt.list_method)
+        items = paginate(list_fn, label=resource_type, stats=self.page_stats,
+                         **rt.list_call_kwargs(self, compartment_id, created_after))
 
+        resources = []
+        for item in items:
+            if created_after is not None:
+                created = rt.time_created(item)
+                if created is not None and created <= created_after:
+                    if rt.sort_by:
+                        break  # o restante da listagem já foi avaliado em varreduras anteriores
+                    continue  # tipo sem ordenação por data: filtra sem interromper a paginação
+            if self._has_target_tag(item.defined_tags, tag_namespace, tag_key, tag_value):
+                resources.append(rt.to_resource(item, compartment_id, self.region))
         return resources
 
     def _has_target_tag(self, defined_tags: Dict, namespace: str, key: str, value: str) -> bool:
@@ -154,67 +126,60 @@ class OCITagRemover:
     def remove_tag_from_resource(self, resource: Dict[str, Any], tag_namespace: str = "finops", tag_key: str = "customer") -> bool:
         """Remove a tag específica de um recurso."""
         try:
-            resource_type = resource["type"]
-            resource_id = resource["id"]
-            current_tags = resource["defined_tags"].copy()
-            
-            # Remove a tag específica
-            if tag_namespace in current_tags and tag_key in current_tags[tag_namespace]:
-                del current_tags[tag_namespace][tag_key]
-                
-                # Se o namespace ficou vazio, remove ele também
-                if not current_tags[tag_namespace]:
-                    del current_tags[tag_namespace]
-
-            # Atualiza o recurso baseado no tipo
-            if resource_type == "Instance":
-                self.compute_client.update_instance(
-                    instance_id=resource_id,
-                    update_instance_details=oci.core.models.UpdateInstanceDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            elif resource_type == "Volume":
-                self.blockstorage_client.update_volume(
-                    volume_id=resource_id,
-                    update_volume_details=oci.core.models.UpdateVolumeDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            elif resource_type == "VCN":
-                self.network_client.update_vcn(
-                    vcn_id=resource_id,
-                    update_vcn_details=oci.core.models.UpdateVcnDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            elif resource_type == "Subnet":
-                self.network_client.update_subnet(
-                    subnet_id=resource_id,
-                    update_subnet_details=oci.core.models.UpdateSubnetDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            elif resource_type == "Load Balancer":
-                self.loadbalancer_client.update_load_balancer(
-                    load_balancer_id=resource_id,
-                    update_load_balancer_details=oci.core.models.UpdateLoadBalancerDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            elif resource_type == "Database":
-                self.database_client.update_database(
-                    database_id=resource_id,
-                    update_database_details=oci.database.models.UpdateDatabaseDetails(
-                        defined_tags=current_tags
-                    )
-                )
-            
+            self.update_resource_tags(resource, tag_namespace, tag_key)
             return True
         except Exception as e:
-            console.print(f"[red]Erro ao remover tag de {resource_type} {resource['name']}: {e}[/red]")
+            console.print(f"[red]Erro ao remover tag de {resource['type']} {resource['name']}: {e}[/red]")
             return False
 
+    def get_current_tags(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        """Lê o defined_tags atual do recurso direto da API (sem depender do inventário)."""
+        rt = get_resource_type(resource["type"])
+        return rt.get(self.client(rt.client, resource.get("region")), resource).defined_tags or {}
+
+    def update_resource_tags(self, resource: Dict[str, Any], tag_namespace: str = "finops", tag_key: str = "customer",
+                             tag_value: str = "seduc-go", verify: bool = True) -> bool:
+        """
+        Remove a tag do recurso e lança a exceção da OCI em caso de falha.
+
+        Com verify=True as tags atuais são relidas imediatamente antes da atualização: o
+        inventário pode vir do cache, e a alteração não pode sobrescrever tags mudadas
+        depois da varredura. Retorna False se a tag já não estiver no recurso ou se o valor
+        dela não for mais tag_value (ex.: alterado para outro cliente depois do snapshot).
+
+        O retry interno do SDK é desligado para que o RemovalExecutor enxergue os 429
+        e ajuste a concorrência.
+        """
+        if verify:
+            resource["defined_tags"] = self.get_current_tags(resource)
+            if resource["defined_tags"].get(tag_namespace, {}).get(tag_key) != tag_value:
+                return False
+
+        # Cópia profunda: o dicionário original (tags antes da alteração) vai para o journal
+        current_tags = copy.deepcopy(resource["defined_tags"])
+        
+        # Remove a tag específica
+        if tag_namespace in current_tags and tag_key in current_tags[tag_namespace]:
+            del current_tags[tag_namespace][tag_key]
+            
+            # Se o namespace ficou vazio, remove ele também
+            if not current_tags[tag_namespace]:
+                del current_tags[tag_namespace]
+
+        self._apply_defined_tags(resource, current_tags)
+        return True
+
+    def restore_resource_tags(self, resource: Dict[str, Any]):
+        """Regrava o defined_tags original do recurso (usado pelo --rollback)."""
+        self._apply_defined_tags(resource, resource["defined_tags"])
+
+    def _apply_defined_tags(self, resource: Dict[str, Any], current_tags: Dict[str, Any]):
+        """Substitui o defined_tags do recurso, sem retry do SDK."""
+        rt = get_resource_type(resource["type"])
+        # Entradas antigas do journal/inventário sem "region" usam a região do config
+        rt.update(self.client(rt.client, resource.get("region")), resource, current_tags,
+                  retry_strategy=oci.retry.NoneRetryStrategy())
+
     def display_resources_table(self, resources: List[Dict[str, Any]], compartment_name: str):
         """Exibe uma tabela com os recursos encontrados."""
         if not resources:
@@ -237,8 +202,238 @@ class OCITagRemover:
 
         console.print(table)
 
-def main():
+def scan_tagged_resources(remover: OCITagRemover, workers: int, cache: InventoryCache, resource_types: List[str],
+                          regions_spec: Optional[str] = None,
+                          compartment_filter: Optional[CompartmentFilter] = None) -> List[Dict[str, Any]]:
+    """Varre a tenancy (ou lê o snapshot do dry-run no cache) e exibe os recursos com a tag."""
+    # Obtém todos os compartimentos
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+        task = progress.add_task("Buscando compartimentos...", total=None)
+        compartments = cache.cached_compartments(remover.config['tenancy'], remover.get_compartments)
+        progress.update(task, description="Compartimentos encontrados")
+
+    if not compartments:
+        console.print("[red]Nenhum compartimento encontrado ou erro na conexão.[/red]")
+        return []
+
+    compartment_filter = compartment_filter or CompartmentFilter()
+    selected, filtered = compartment_filter.apply(compartments)
+    if filtered or remover.inactive_compartments:
+        details = [f"{filtered} fora dos filtros"] if compartment_filter.active else []
+        if remover.inactive_compartments:
+            details.append(f"{remover.inactive_compartments} inativos ignorados")
+        console.print(f"[blue]Compartimentos: {len(selected)} de {len(compartments)} selecionados ({', '.join(details)})[/blue]")
+    if not selected:
+        console.print("[yellow]Nenhum compartimento corresponde aos filtros --include/--exclude.[/yellow]")
+        return []
+    compartments = selected
+
+    try:
+        regions = resolve_regions(regions_spec, remover.region, remover.subscribed_regions)
+    except Exception as e:
+        console.print(f"[red]Erro ao listar regiões assinadas: {e}[/red]")
+        return []
+
+    def scan_region(region: str):
+        # Busca recursos em todos os compartimentos da região, em paralelo
+        regional = remover.in_region(region)
+        scan_unit = cache.cached_unit(regional.find_resources_of_type, tag_filter_key(DEFAULT_RULE, region))
+        engine = ScanEngine(scan_unit, max_workers=workers,
+                            on_error=lambda comp_id, rtype, e: report_scan_error(comp_id, rtype, e, region))
+        return engine, engine.scan(compartments, resource_types)
+
+    description = f"Buscando recursos em {len(compartments)} compartimentos ({workers} workers)"
+    if len(regions) > 1:
+        description += f" em {len(regions)} regiões"
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+        task = progress.add_task(f"{description}...", total=None)
+        region_results = fan_out(regions, scan_region)
+        found = sum(len(r) for result in region_results if result.error is None for r in result.value[1].values())
+        progress.update(task, description=f"Encontrados {found} recursos")
+
+    total_resources = []
+    multi_region = len(regions) > 1
+    for result in region_results:
+        if result.error is not None:
+            console.print(f"[red]Erro ao varrer a região {result.region}: {result.error}[/red]")
+            continue
+        for compartment in compartments:
+            resources = result.value[1][compartment['id']]
+            if resources:
+                label = f"{compartment['name']} ({result.region})" if multi_region else compartment['name']
+                console.print(f"\n[bold]Compartimento: {label}[/bold]")
+                remover.display_resources_table(resources, label)
+                total_resources.extend(resources)
+
+    console.print()
+    for result in region_results:
+        prefix = f"Região {result.region} ({result.wall_time:.2f}s): " if multi_region else ""
+        summary = result.value[0].stats.summary() if result.error is None else "erro"
+        console.print(f"[blue]{prefix}Varredura: {summary}[/blue]")
+    if multi_region:
+        console.print(f"[blue]Regiões: {len(regions)} | tempo de parede: {max(r.wall_time for r in region_results):.2f}s | "
+                      f"soma das regiões: {sum(r.wall_time for r in region_results):.2f}s[/blue]")
+    console.print(f"[blue]Inventário: {cache.summary()}[/blue]")
+    for line in remover.page_stats.summary_lines():
+        console.print(f"  [dim]• {line}[/dim]")
+    return total_resources
+
+
+def run_updates(update_fn, resources: List[Dict[str, Any]], journal: RemovalJournal, max_concurrency: int,
+                success_event: str, failure_event: str, label: str, cache: Optional[InventoryCache] = None,
+                tag_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Executa update_fn em paralelo, registrando cada resultado no journal, e imprime o resumo.
+    Retorna os recursos atualizados com sucesso.
+
+    Com cache, os recursos alterados (e os ignorados, cujo snapshot também estava desatualizado)
+    são invalidados no inventário ao final, mesmo se a execução for interrompida. tag_filter
+    segue a semântica de InventoryCache.invalidate.
+    """
+    console.print(f"\n[bold]{label} (até {max_concurrency} atualizações simultâneas)...[/bold]")
+    executor = RemovalExecutor(update_fn, max_concurrency=max_concurrency)
+    updated: List[Dict[str, Any]] = []
+    stale: List[Dict[str, Any]] = []
+
+    with Progress() as progress:
+        task = progress.add_task(f"{label}...", total=len(resources))
+
+        def on_done(resource: Dict[str, Any], outcome: str, error: Exception):
+            event = {"succeeded": success_event, "skipped": "skipped", "failed": failure_event}[outcome]
+            journal.record(event, resource, error)
+            if outcome != "failed":
+                stale.append(resource)
+            if outcome == "succeeded":
+                updated.append(resource)
+                progress.update(task, advance=1, description=f"✓ {resource['type']} {resource['name']}")
+            elif outcome == "skipped":
+                progress.update(task, advance=1, description=f"- {resource['type']} {resource['name']} (tag ausente ou alterada)")
+            else:
+                progress.console.print(f"[red]Erro ao atualizar tags de {resource['type']} {resource['name']}: {error}[/red]")
+                progress.update(task, advance=1, description=f"✗ {resource['type']} {resource['name']}")
+
+        try:
+            stats = executor.run(resources, on_done=on_done)
+        finally:
+            journal.close()
+            if cache is not None and stale:
+                changed = cache.invalidate(stale, tag_filter)
+                progress.console.print(f"[dim]Inventário: {changed} snapshots atualizados em {cache.path}[/dim]")
+
+    # Resumo final
+    console.print("\n[bold]Resumo da operação:[/bold]")
+    console.print(f"[green]✓ Sucessos: {stats.succeeded}[/green]")
+    if stats.skipped > 0:
+        console.print(f"[yellow]- Ignorados (tag ausente ou alterada): {stats.skipped}[/yellow]")
+    if stats.failed > 0:
+        console.print(f"[red]✗ Erros: {stats.failed}[/red]")
+    console.print(f"[blue]Atualizações: {stats.summary()}[/blue]")
+    console.print(f"[dim]Journal: {journal.path}[/dim]")
+    
+    console.print("\n[green]Operação concluída![/green]")
+    return updated
+
+
+def verify_removals(remover: OCITagRemover, resources: List[Dict[str, Any]], journal: RemovalJournal,
+                    max_concurrency: int, attempts: int, delay: float, report_path: str):
+    """
+    Relê os recursos atualizados para confirmar que a tag saiu, registra o resultado no
+    journal e grava o relatório de reconciliação com os que não puderam ser confirmados.
+    """
+    console.print(f"\n[bold]Verificando remoções ({len(resources)} recursos, até {attempts} rodadas)...[/bold]")
+    verifier = TagVerifier(remover.get_current_tags, "finops", "customer", max_concurrency=max_concurrency,
+                           attempts=attempts, delay=delay)
+    events = {CONFIRMED: "verified", GONE: "verified", STILL_TAGGED: "still_tagged", ERROR: "verify_failed"}
+
+    with Progress() as progress:
+        task = progress.add_task("Verificando...", total=len(resources))
+
+        def on_round(round_number: int, count: int, wait: float):
+            if round_number > 1:
+                progress.console.print(f"[yellow]Rodada {round_number}: {count} recursos ainda com a tag, "
+                                       f"nova leitura em {wait:g}s[/yellow]")
+
+        def on_result(result):
+            journal.record(events[result.status], result.resource, result.error,
+                           attempts=result.attempts, verification=result.status)
+            progress.update(task, advance=1)
+
+        try:
+            results = verifier.run(resources, on_result=on_result, on_round=on_round)
+        finally:
+            journal.close()
+
+    stats = verifier.stats
+    unconfirmed = [result for result in results if result.status in (STILL_TAGGED, ERROR)]
+    console.print(f"[green]✓ Confirmados: {stats.counts[CONFIRMED] + stats.counts[GONE]}[/green]"
+                  + (f" [dim](removidos depois da atualização: {stats.counts[GONE]})[/dim]" if stats.counts[GONE] else ""))
+    if stats.counts[STILL_TAGGED]:
+        console.print(f"[red]✗ Ainda com a tag: {stats.counts[STILL_TAGGED]}[/red]")
+    if stats.counts[ERROR]:
+        console.print(f"[red]✗ Erros de leitura: {stats.counts[ERROR]}[/red]")
+    console.print(f"[blue]Verificação: {stats.summary()}[/blue]")
+
+    if unconfirmed:
+        table = Table(title="Reconciliação: remoções não confirmadas")
+        table.add_column("Região", style="blue")
+        table.add_column("Tipo", style="cyan")
+        table.add_column("Nome", style="green")
+        table.add_column("Status", style="red")
+        table.add_column("Leituras", justify="right")
+        table.add_column("Detalhe", style="yellow")
+        for result in unconfirmed:
+            detail = describe_error(result.error) if result.error else f"finops.customer: {result.tag_value}"
+            table.add_row(result.resource.get("region") or "-", result.resource["type"], result.resource["name"],
+                          result.status, str(result.attempts), detail)
+        console.print(table)
+        console.print("[yellow]Use --resume para reenviar a remoção dos recursos que ainda têm a tag.[/yellow]")
+
+    write_report(report_path, results)
+    console.print(f"[dim]Relatório de reconciliação: {report_path} ({len(unconfirmed)} recursos)[/dim]")
+
+
+@click.command()
+@click.option("--workers", default=DEFAULT_WORKERS, show_default=True, type=click.IntRange(min=1),
+              help="Número de threads para varrer (compartimento, tipo de recurso) em paralelo.")
+@click.option("--max-concurrency", default=DEFAULT_MAX_CONCURRENCY, show_default=True, type=click.IntRange(min=1),
+              help="Limite superior de atualizações simultâneas; a concorrência real se ajusta aos 429 da API.")
+@click.option("--types", "types_spec", default="default", show_default=True,
+              help="Tipos de recurso: default, all ou lista separada por vírgula (ex.: \"Instance,Bucket\").")
+@click.option("--regions", "regions_spec", default=None,
+              help="Regiões a varrer em paralelo: all (todas as assinadas) ou lista separada por vírgula. Padrão: região do config.")
+@click.option("--include", "include_paths", multiple=True,
+              help="Glob de caminho de compartimento a varrer, com toda a subárvore (repetível), ex.: \"prod/*\".")
+@click.option("--exclude", "exclude_paths", multiple=True,
+              help="Glob de caminho de compartimento a ignorar, com toda a subárvore (repetível).")
+@click.option("--journal", "journal_path", default=DEFAULT_JOURNAL_PATH, show_default=True,
+              help="Arquivo JSONL com as tags originais e o resultado de cada remoção.")
+@click.option("--resume", is_flag=True, help="Retoma a última execução do journal, sem reescanear a tenancy.")
+@click.option("--rollback", is_flag=True, help="Restaura o defined_tags original de todos os recursos alterados.")
+@click.option("--cache", "cache_path", default=DEFAULT_CACHE_PATH, show_default=True,
+              help="Inventário SQLite gravado pelo dry_run.py; reaproveitado enquanto estiver dentro do TTL.")
+@click.option("--cache-ttl", default=DEFAULT_TTL_HOURS, show_default=True, type=click.FloatRange(min=0),
+              help="Validade do inventário em horas.")
+@click.option("--refresh", is_flag=True, help="Ignora o inventário em cache e refaz a varredura completa.")
+@click.option("--verify/--no-verify", default=True, show_default=True,
+              help="Relê os recursos atualizados para confirmar que a tag foi removida.")
+@click.option("--verify-attempts", default=DEFAULT_ATTEMPTS, show_default=True, type=click.IntRange(min=1),
+              help="Rodadas de leitura para os recursos que ainda mostram a tag.")
+@click.option("--verify-delay", default=DEFAULT_DELAY, show_default=True, type=click.FloatRange(min=0),
+              help="Espera em segundos antes da segunda rodada; dobra a cada rodada seguinte.")
+@click.option("--verify-report", "verify_report_path", default=DEFAULT_REPORT_PATH, show_default=True,
+              help="Arquivo JSONL com os recursos cuja remoção não foi confirmada.")
+def main(workers: int, max_concurrency: int, types_spec: str, regions_spec: Optional[str],
+         include_paths: List[str], exclude_paths: List[str], journal_path: str, resume: bool, rollback: bool,
+         cache_path: str, cache_ttl: float, refresh: bool, verify: bool, verify_attempts: int,
+         verify_delay: float, verify_report_path: str):
     """Função principal."""
+    if resume and rollback:
+        raise click.UsageError("--resume e --rollback não podem ser usados juntos.")
+    try:
+        resource_types = parse_resource_types(types_spec)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--types")
+
     console.print(Panel.fit(
         "[bold blue]Removedor de Tags OCI[/bold blue]\n"
         "Remove tags 'finops.customer: seduc-go' de todos os recursos",
@@ -247,33 +442,41 @@ def main():
 
     # Inicializa o cliente OCI
     remover = OCITagRemover()
-    
-    # Obtém todos os compartimentos
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
-        task = progress.add_task("Buscando compartimentos...", total=None)
-        compartments = remover.get_compartments()
-        progress.update(task, description="Compartimentos encontrados")
+    journal = RemovalJournal(journal_path)
 
-    if not compartments:
-        console.print("[red]Nenhum compartimento encontrado ou erro na conexão.[/red]")
+    if rollback:
+        resources = journal.removed()
+        if not resources:
+            console.print(f"[yellow]Nenhuma remoção pendente de rollback em {journal_path}.[/yellow]")
+            return
+        console.print(f"\n[bold red]ATENÇÃO:[/bold red] {len(resources)} recursos terão o defined_tags original restaurado")
+        if not click.confirm("Deseja continuar com o rollback?"):
+            console.print("[yellow]Operação cancelada pelo usuário.[/yellow]")
+            return
+        journal.mark("rollback", total=len(resources))
+        # A tag volta aos recursos: os snapshots das unidades afetadas são descartados
+        cache = InventoryCache(cache_path, ttl_hours=cache_ttl)
+        try:
+            run_updates(remover.restore_resource_tags, resources, journal, max_concurrency,
+                        "restored", "restore_failed", "Restaurando tags", cache=cache)
+        finally:
+            cache.close()
+        console.print(f"[dim]Clientes OCI: {remover.clients.summary()}[/dim]")
         return
 
-    total_resources = []
-    all_resources = []
-
-    # Busca recursos em todos os compartimentos
-    for compartment in compartments:
-        console.print(f"\n[bold]Analisando compartimento: {compartment['name']}[/bold]")
-        
-        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
-            task = progress.add_task(f"Buscando recursos em {compartment['name']}...", total=None)
-            resources = remover.find_resources_with_tag(compartment['id'])
-            progress.update(task, description=f"Encontrados {len(resources)} recursos")
-
-        if resources:
-            remover.display_resources_table(resources, compartment['name'])
-            all_resources.extend(resources)
-            total_resources.extend(resources)
+    if resume:
+        total_resources = journal.pending()
+        if not total_resources:
+            console.print(f"[green]✓[/green] Nenhum recurso pendente em {journal_path}.")
+            return
+        console.print(f"[blue]Retomando execução do journal: {len(total_resources)} recursos pendentes[/blue]")
+    else:
+        cache = InventoryCache(cache_path, ttl_hours=cache_ttl, refresh=refresh)
+        try:
+            total_resources = scan_tagged_resources(remover, workers, cache, resource_types, regions_spec,
+                                                    CompartmentFilter(include_paths, exclude_paths))
+        finally:
+            cache.close()
 
     if not total_resources:
         console.print("\n[green]✓[/green] Nenhum recurso com a tag 'finops.customer: seduc-go' foi encontrado.")
@@ -286,32 +489,21 @@ def main():
         console.print("[yellow]Operação cancelada pelo usuário.[/yellow]")
         return
 
-    # Remove as tags
-    console.print("\n[bold]Removendo tags...[/bold]")
-    success_count = 0
-    error_count = 0
-
-    with Progress() as progress:
-        task = progress.add_task("Removendo tags...", total=len(total_resources))
-        
-        for resource in total_resources:
-            if remover.remove_tag_from_resource(resource):
-                success_count += 1
-                progress.update(task, description=f"✓ {resource['type']} {resource['name']}")
-            else:
-                error_count += 1
-                progress.update(task, description=f"✗ {resource['type']} {resource['name']}")
-            
-            progress.advance(task)
-            time.sleep(0.1)  # Pequena pausa para não sobrecarregar a API
+    if resume:
+        journal.mark("resume", total=len(total_resources))
+    else:
+        journal.start_run(total_resources)
 
-    # Resumo final
-    console.print(f"\n[bold]Resumo da operação:[/bold]")
-    console.print(f"[green]✓ Sucessos: {success_count}[/green]")
-    if error_count > 0:
-        console.print(f"[red]✗ Erros: {error_count}[/red]")
-    
-    console.print(f"\n[green]Operação concluída![/green]")
+    # Remove as tags em paralelo, com concorrência adaptativa ao rate limit da API
+    cache = InventoryCache(cache_path, ttl_hours=cache_ttl)
+    try:
+        updated = run_updates(remover.update_resource_tags, total_resources, journal, max_concurrency,
+                              "removed", "failed", "Removendo tags", cache=cache, tag_filter=DEFAULT_RULE)
+    finally:
+        cache.close()
+    if verify and updated:
+        verify_removals(remover, updated, journal, max_concurrency, verify_attempts, verify_delay, verify_report_path)
+    console.print(f"[dim]Clientes OCI: {remover.clients.summary()}[/dim]")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -4,42 +4,108 @@ Script para modo DRY-RUN - apenas lista recursos com tags "finops.customer: sedu
 """
 
 import oci
+import click
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 import sys
-from typing import List, Dict, Any
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from client_pool import ClientPool, LazyClients
+from compartment_tree import CompartmentFilter, build_tree, list_compartment_tree
+from inventory_cache import DEFAULT_CACHE_PATH, DEFAULT_FULL_SCAN_HOURS, DEFAULT_TTL_HOURS, InventoryCache, tag_filter_key
+from output_writers import FORMATS, open_writer, resource_row
+from pagination import PageStats, paginate
+from region_fanout import fan_out, resolve_regions, subscribed_regions
+from resource_registry import DEFAULT_RESOURCE_TYPES, get_resource_type, parse_resource_types
+from scan_engine import DEFAULT_WORKERS, ScanEngine
+from search_discovery import SearchDiscovery, build_tag_query
+from tag_rules import DEFAULT_RULE, TagMatcher, load_rules_file
 
 console = Console()
 
-class OCITagScanner:
-    def __init__(self, config_path: str = "~/.oci/config"):
-        """Inicializa o cliente OCI com configuração."""
+def report_scan_error(compartment_id: str, resource_type: str, error: Exception, region: Optional[str] = None):
+    """Aviso padrão para unidades (compartimento, tipo) que falharam na listagem."""
+    where = f"no compartimento {compartment_id}" + (f" ({region})" if region else "")
+    console.print(f"[yellow]Aviso: Erro ao listar {resource_type} {where}: {error}[/yellow]")
+
+class ScanTally:
+    """Contagens do resumo final, alimentadas recurso a recurso (inclusive no modo streaming)."""
+
+    def __init__(self, matcher: TagMatcher):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.by_region: Dict[str, int] = {}
+        self.by_rule: Dict[str, Dict[str, int]] = {rule.spec: {} for rule in matcher.rules}
+        self.by_compartment: Dict[str, int] = {}
+
+    def add(self, resource: Dict[str, Any], compartment_label: str):
+        with self._lock:
+            self.total += 1
+            self.by_region[resource.get("region")] = self.by_region.get(resource.get("region"), 0) + 1
+            for rule in resource.get("rules", []):
+                by_type = self.by_rule.setdefault(rule, {})
+                by_type[resource["type"]] = by_type.get(resource["type"], 0) + 1
+            self.by_compartment[compartment_label] = self.by_compartment.get(compartment_label, 0) + 1
+
+
+def select_compartments(compartments: List[Dict[str, Any]], compartment_filter: CompartmentFilter,
+                        inactive: int = 0) -> List[Dict[str, Any]]:
+    """Aplica --include/--exclude à árvore e informa quantos compartimentos ficaram de fora."""
+    selected, filtered = compartment_filter.apply(compartments)
+    if compartments and (filtered or inactive):
+        details = [f"{filtered} fora dos filtros"] if compartment_filter.active else []
+        if inactive:
+            details.append(f"{inactive} inativos ignorados")
+        console.print(f"[blue]Compartimentos: {len(selected)} de {len(compartments)} selecionados ({', '.join(details)})[/blue]")
+    if compartments and not selected:
+        console.print("[yellow]Nenhum compartimento corresponde aos filtros --include/--exclude.[/yellow]")
+    return selected
+
+class OCITagScanner(LazyClients):
+    def __init__(self, config_path: str = "~/.oci/config", config: Optional[Dict[str, Any]] = None,
+                 factories: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa o cliente OCI com configuração. config e factories substituem o arquivo
+        de configuração e as classes do SDK (usados pelo backend falso do benchmark scale).
+        """
+        start = time.perf_counter()
         try:
-            self.config = oci.config.from_file(config_path)
-            self.identity_client = oci.identity.IdentityClient(self.config)
-            self.compute_client = oci.core.ComputeClient(self.config)
-            self.network_client = oci.core.VirtualNetworkClient(self.config)
-            self.blockstorage_client = oci.core.BlockstorageClient(self.config)
-            self.database_client = oci.database.DatabaseClient(self.config)
-            self.loadbalancer_client = oci.load_balancer.LoadBalancerClient(self.config)
-            self.objectstorage_client = oci.object_storage.ObjectStorageClient(self.config)
-            console.print(f"[green]✓[/green] Conectado à OCI usando configuração: {config_path}")
+            self.config = config if config is not None else oci.config.from_file(config_path)
+            self.page_stats = PageStats()
+            self.clients = ClientPool(self.config, factories)
+            self.region = self.config.get("region")
+            self.inactive_compartments = 0
+            self.matcher = TagMatcher.default()
+            self._object_storage_namespace = None
+            # Os clientes de cada serviço são criados no primeiro uso (client_pool.py)
+            self.startup_time = time.perf_counter() - start
+            console.print(f"[green]✓[/green] Conectado à OCI usando configuração: {config_path if config is None else 'em memória'} "
+                          f"(inicialização: {self.startup_time * 1000:.0f} ms)")
         except Exception as e:
             console.print(f"[red]✗[/red] Erro ao conectar à OCI: {e}")
             sys.exit(1)
 
+    @property
+    def object_storage_namespace(self) -> str:
+        """Namespace do Object Storage da tenancy (necessário para listar buckets)."""
+        if self._object_storage_namespace is None:
+            self._object_storage_namespace = self.objectstorage_client.get_namespace().data
+        return self._object_storage_namespace
+
+    def subscribed_regions(self) -> List[str]:
+        """Regiões assinadas pela tenancy (usadas por --regions all)."""
+        return subscribed_regions(self.identity_client, self.config['tenancy'])
+
     def get_compartments(self) -> List[Dict[str, Any]]:
-        """Obtém todos os compartimentos acessíveis."""
+        """Obtém a árvore de compartimentos ativos (com o caminho de cada um a partir da raiz)."""
         try:
-            response = self.identity_client.list_compartments(
-                compartment_id=self.config['tenancy'],
-                access_level="ACCESSIBLE"
-            )
-            compartments = [{"id": self.config['tenancy'], "name": "Root Compartment"}] + [
-                {"id": comp.id, "name": comp.name} for comp in response.data
-            ]
+            summaries = list_compartment_tree(self, self.config['tenancy'], self.page_stats)
+            compartments, self.inactive_compartments = build_tree(self.config['tenancy'], summaries)
             return compartments
         except Exception as e:
             console.print(f"[red]Erro ao listar compartimentos: {e}[/red]")
@@ -47,132 +113,170 @@ class OCITagScanner:
 
     def find_resources_with_tag(self, compartment_id: str, tag_namespace: str = "finops", tag_key: str = "customer", tag_value: str = "seduc-go") -> List[Dict[str, Any]]:
         """Encontra todos os recursos com a tag específica."""
+        matcher = TagMatcher.parse([f"{tag_namespace}.{tag_key}={tag_value}"])
         resources = []
-        
-        # Instâncias de computação
-        try:
-            instances = self.compute_client.list_instances(compartment_id=compartment_id).data
-            for instance in instances:
-                if self._has_target_tag(instance.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Instance",
-                        "id": instance.id,
-                        "name": instance.display_name,
-                        "lifecycle_state": instance.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar instâncias: {e}[/yellow]")
+        for resource_type in DEFAULT_RESOURCE_TYPES:
+            try:
+                resources.extend(self.find_resources_of_type(compartment_id, resource_type, matcher=matcher))
+            except Exception as e:
+                report_scan_error(compartment_id, resource_type, e)
+        return resources
 
-        # Volumes de bloco
-        try:
-            volumes = self.blockstorage_client.list_volumes(compartment_id=compartment_id).data
-            for volume in volumes:
-                if self._has_target_tag(volume.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Volume",
-                        "id": volume.id,
-                        "name": volume.display_name,
-                        "lifecycle_state": volume.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar volumes: {e}[/yellow]")
+    def find_resources_of_type(self, compartment_id: str, resource_type: str, created_after: Optional[datetime] = None,
+                               matcher: Optional[TagMatcher] = None) -> List[Dict[str, Any]]:
+        """
+        Encontra os recursos de um único tipo que satisfazem ao menos uma regra de tag
+        (unidade de trabalho do ScanEngine). Cada recurso leva em "rules" as regras satisfeitas.
 
-        # VCNs
-        try:
-            vcns = self.network_client.list_vcns(compartment_id=compartment_id).data
-            for vcn in vcns:
-                if self._has_target_tag(vcn.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "VCN",
-                        "id": vcn.id,
-                        "name": vcn.display_name,
-                        "lifecycle_state": vcn.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar VCNs: {e}[/yellow]")
+        Erros de API são propagados (o ScanEngine os contabiliza e reporta).
 
-        # Subnets
-        try:
-            subnets = self.network_client.list_subnets(compartment_id=compartment_id).data
-            for subnet in subnets:
-                if self._has_target_tag(subnet.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Subnet",
-                        "id": subnet.id,
-                        "name": subnet.display_name,
-                        "lifecycle_state": subnet.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar subnets: {e}[/yellow]")
+        Com created_after, a listagem é ordenada por data de criação decrescente e a paginação
+        para no primeiro recurso criado até esse instante (varredura incremental).
+        """
+        matcher = matcher or self.matcher
+        rt = get_resource_type(resource_type)
+        list_fn = getattr(getattr(self, rt.client), rt.list_method)
+        items = paginate(list_fn, label=resource_type, stats=self.page_stats,
+                         **rt.list_call_kwargs(self, compartment_id, created_after))
 
-        # Load Balancers
-        try:
-            load_balancers = self.loadbalancer_client.list_load_balancers(compartment_id=compartment_id).data
-            for lb in load_balancers:
-                if self._has_target_tag(lb.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Load Balancer",
-                        "id": lb.id,
-                        "name": lb.display_name,
-                        "lifecycle_state": lb.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar load balancers: {e}[/yellow]")
+        resources = []
+        for item in items:
+            if created_after is not None:
+                created = rt.time_created(item)
+                if created is not None and created <= created_after:
+                    if rt.sort_by:
+                        break  # o restante da listagem já foi avaliado em varreduras anteriores
+                    continue  # tipo sem ordenação por data: filtra sem interromper a paginação
+            matched = matcher.match(item.defined_tags, getattr(item, "freeform_tags", None))
+            if matched:
+                resource = rt.to_resource(item, compartment_id, self.region)
+                resource["rules"] = matched
+                resources.append(resource)
+        return resources
 
-        # Databases
+    def recheck_resource(self, resource: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Relê um recurso do inventário (recheck do modo incremental). Retorna o recurso com as
+        tags atuais, ou None se ele não existe mais ou não satisfaz mais nenhuma regra.
+        """
+        rt = get_resource_type(resource["type"])
         try:
-            databases = self.database_client.list_databases(compartment_id=compartment_id).data
-            for db in databases:
-                if self._has_target_tag(db.defined_tags, tag_namespace, tag_key, tag_value):
-                    resources.append({
-                        "type": "Database",
-                        "id": db.id,
-                        "name": db.db_name,
-                        "lifecycle_state": db.lifecycle_state,
-                        "compartment_id": compartment_id
-                    })
-        except Exception as e:
-            console.print(f"[yellow]Aviso: Erro ao listar databases: {e}[/yellow]")
+            item = rt.get(self.client(rt.client, resource.get("region")), resource)
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return None
+            raise
+        freeform_tags = getattr(item, "freeform_tags", None)
+        matched = self.matcher.match(item.defined_tags, freeform_tags)
+        if not matched:
+            return None
+        return dict(resource, defined_tags=item.defined_tags, freeform_tags=freeform_tags, rules=matched,
+                    lifecycle_state=getattr(item, "lifecycle_state", None) or "-")
 
-        return resources
-
-    def _has_target_tag(self, defined_tags: Dict, namespace: str, key: str, value: str) -> bool:
-        """Verifica se o recurso tem a tag específica."""
-        if not defined_tags:
-            return False
-        return (namespace in defined_tags and 
-                key in defined_tags[namespace] and 
-                defined_tags[namespace][key] == value)
+    def find_resources_via_search(self) -> SearchDiscovery:
+        """Descobre os recursos com a tag em todos os compartimentos com uma única consulta do Resource Search."""
+        return SearchDiscovery(self.search_client, self.page_stats, self.region)
 
     def display_resources_table(self, resources: List[Dict[str, Any]], compartment_name: str):
         """Exibe uma tabela com os recursos encontrados."""
+        label = self.matcher.label
         if not resources:
-            console.print(f"[yellow]Nenhum recurso com a tag 'finops.customer: seduc-go' encontrado no compartimento '{compartment_name}'[/yellow]")
+            console.print(f"[yellow]Nenhum recurso com a tag '{label}' encontrado no compartimento '{compartment_name}'[/yellow]")
             return
 
-        table = Table(title=f"Recursos com tag 'finops.customer: seduc-go' - Compartimento: {compartment_name}")
+        multi_rule = len(self.matcher.rules) > 1
+        table = Table(title=f"Recursos com tag '{label}' - Compartimento: {compartment_name}")
         table.add_column("Tipo", style="cyan")
         table.add_column("Nome", style="green")
         table.add_column("ID", style="blue")
         table.add_column("Estado", style="yellow")
+        if multi_rule:
+            table.add_column("Regras", style="magenta")
 
         for resource in resources:
-            table.add_row(
+            row = [
                 resource["type"],
                 resource["name"],
                 resource["id"],
                 resource["lifecycle_state"]
-            )
+            ]
+            if multi_rule:
+                row.append(", ".join(resource.get("rules", [])))
+            table.add_row(*row)
 
         console.print(table)
 
-def main():
+@click.command()
+@click.option("--workers", default=DEFAULT_WORKERS, show_default=True, type=click.IntRange(min=1),
+              help="Número de threads para varrer (compartimento, tipo de recurso) em paralelo.")
+@click.option("--types", "types_spec", default="default", show_default=True,
+              help="Tipos de recurso: default, all ou lista separada por vírgula (ex.: \"Instance,Bucket\").")
+@click.option("--regions", "regions_spec", default=None,
+              help="Regiões a varrer em paralelo: all (todas as assinadas) ou lista separada por vírgula. Padrão: região do config.")
+@click.option("--include", "include_paths", multiple=True,
+              help="Glob de caminho de compartimento a varrer, com toda a subárvore (repetível), ex.: \"prod/*\".")
+@click.option("--exclude", "exclude_paths", multiple=True,
+              help="Glob de caminho de compartimento a ignorar, com toda a subárvore (repetível).")
+@click.option("--discovery", type=click.Choice(["list", "search"]), default="list", show_default=True,
+              help="list: lista cada tipo em cada compartimento; search: uma consulta única no Resource Search.")
+@click.option("--rule", "rule_specs", multiple=True,
+              help=f"Regra de tag (repetível), ex.: finops.customer^=seduc-, !finops.cost-center, freeform:env=prod. Padrão: {DEFAULT_RULE}.")
+@click.option("--rules-file", type=click.Path(exists=True, dir_okay=False),
+              help="Arquivo com uma regra de tag por linha (somado às regras de --rule).")
+@click.option("--format", "output_format", type=click.Choice(FORMATS), default=None,
+              help="Grava cada recurso encontrado em streaming (jsonl, csv ou parquet) em vez de exibir tabelas.")
+@click.option("--output", default=None,
+              help="Arquivo de saída do --format (padrão: saída padrão; obrigatório para parquet).")
+@click.option("--cache", "cache_path", default=DEFAULT_CACHE_PATH, show_default=True,
+              help="Inventário SQLite gravado para o delete_tags.py reaproveitar (modo list).")
+@click.option("--cache-ttl", default=DEFAULT_TTL_HOURS, show_default=True, type=click.FloatRange(min=0),
+              help="Validade do inventário em horas (com --use-cache).")
+@click.option("--use-cache", is_flag=True,
+              help="Reaproveita as unidades do inventário dentro do TTL em vez de varrê-las de novo "
+                   "(por padrão o dry-run sempre varre a tenancy e só grava o inventário).")
+@click.option("--refresh", is_flag=True, help="No modo incremental, ignora o inventário e refaz a varredura completa.")
+@click.option("--incremental", is_flag=True,
+              help="Lista apenas recursos criados desde a última varredura de cada (compartimento, tipo) e relê "
+                   "os já inventariados (um GET por recurso). Recursos antigos que passaram a ter a tag só "
+                   "aparecem na próxima varredura completa (--full-scan-every).")
+@click.option("--full-scan-every", default=DEFAULT_FULL_SCAN_HOURS, show_default=True, type=click.FloatRange(min=0),
+              help="No modo incremental, refaz a varredura completa de uma unidade após este número de horas.")
+def main(workers: int, types_spec: str, regions_spec: Optional[str], include_paths: List[str], exclude_paths: List[str],
+         discovery: str, rule_specs: List[str], rules_file: Optional[str], output_format: Optional[str], output: Optional[str],
+         cache_path: str, cache_ttl: float, use_cache: bool, refresh: bool, incremental: bool, full_scan_every: float):
     """Função principal - modo DRY-RUN."""
+    try:
+        resource_types = parse_resource_types(types_spec)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--types")
+    specs = list(rule_specs) + (load_rules_file(rules_file) if rules_file else [])
+    try:
+        matcher = TagMatcher.parse(specs or [DEFAULT_RULE])
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--rule")
+    if discovery == "search" and matcher.single_exact is None:
+        raise click.UsageError("--discovery search aceita apenas uma regra de valor exato sobre defined tag.")
+    if discovery == "search":
+        rule = matcher.single_exact
+        try:
+            build_tag_query(rule.namespace, rule.key, rule.value)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--rule")
+    compartment_filter = CompartmentFilter(include_paths, exclude_paths)
+    writer = None
+    if output_format:
+        try:
+            writer = open_writer(output_format, output)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        except ImportError:
+            raise click.UsageError("o formato parquet requer o pacote pyarrow (pip install pyarrow).")
+        if output in (None, "-"):
+            # A saída padrão fica só com os dados; mensagens e progresso vão para stderr
+            console.file = sys.stderr
+    elif output:
+        raise click.UsageError("--output requer --format.")
+
     console.print(Panel.fit(
         "[bold yellow]Scanner de Tags OCI - MODO DRY-RUN[/bold yellow]\n"
         "Lista recursos com tags 'finops.customer: seduc-go' sem fazer alterações",
@@ -181,48 +285,155 @@ def main():
 
     # Inicializa o scanner OCI
     scanner = OCITagScanner()
+    scanner.matcher = matcher
     
+    cache = InventoryCache(cache_path, ttl_hours=cache_ttl, refresh=refresh)
+
     # Obtém todos os compartimentos
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
         task = progress.add_task("Buscando compartimentos...", total=None)
-        compartments = scanner.get_compartments()
+        compartments = cache.cached_compartments(scanner.config['tenancy'], scanner.get_compartments, read=use_cache)
         progress.update(task, description="Compartimentos encontrados")
+    compartments = select_compartments(compartments, compartment_filter, scanner.inactive_compartments)
 
-    if not compartments:
+    regions = []
+    if compartments:
+        try:
+            regions = resolve_regions(regions_spec, scanner.region, scanner.subscribed_regions)
+        except Exception as e:
+            console.print(f"[red]Erro ao listar regiões assinadas: {e}[/red]")
+    elif not compartment_filter.active:
         console.print("[red]Nenhum compartimento encontrado ou erro na conexão.[/red]")
+    if not regions:
+        if writer is not None:
+            writer.close()
         return
 
-    total_resources = []
-    compartment_resources = {}
+    names = {comp["id"]: comp["name"] for comp in compartments}
+    paths = {comp["id"]: "/" + comp["path"] for comp in compartments}
+    multi_region = len(regions) > 1
+    tally = ScanTally(matcher)
 
-    # Busca recursos em todos os compartimentos
-    for compartment in compartments:
-        console.print(f"\n[bold]Analisando compartimento: {compartment['name']}[/bold]")
-        
-        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
-            task = progress.add_task(f"Buscando recursos em {compartment['name']}...", total=None)
-            resources = scanner.find_resources_with_tag(compartment['id'])
-            progress.update(task, description=f"Encontrados {len(resources)} recursos")
+    def compartment_label(resource: Dict[str, Any]) -> str:
+        # Na busca podem aparecer compartimentos fora da listagem (ex.: aninhados): exibe pelo OCID
+        name = names.get(resource["compartment_id"], resource["compartment_id"])
+        return f"{name} ({resource['region']})" if multi_region else name
+
+    def emit(resource: Dict[str, Any]):
+        writer.write(resource_row(resource, paths.get(resource["compartment_id"], resource["compartment_id"])))
+        tally.add(resource, compartment_label(resource))
+
+    def emit_unit(compartment_id: str, resource_type: str, resources: List[Dict[str, Any]]):
+        for resource in resources:
+            emit(resource)
 
-        if resources:
-            scanner.display_resources_table(resources, compartment['name'])
-            total_resources.extend(resources)
-            compartment_resources[compartment['name']] = resources
+    def scan_region(region: str):
+        """Varre uma região inteira; devolve (recursos, engine ou None, tipos ignorados pela busca)."""
+        regional = scanner.in_region(region)
+        if discovery == "search":
+            # Uma única consulta paginada cobre todos os compartimentos da região
+            search = regional.find_resources_via_search()
+            rule = matcher.single_exact
+            resources = []
+            for resource in search.find_resources_with_tag(rule.namespace, rule.key, rule.value, resource_types=resource_types):
+                if compartment_filter.active and resource["compartment_id"] not in names:
+                    continue  # a busca cobre a região inteira; compartimentos fora dos filtros são descartados
+                resource["rules"] = [rule.spec]
+                if writer is not None:
+                    emit(resource)
+                else:
+                    resources.append(resource)
+            return resources, None, search.skipped_types
+        # Busca recursos em todos os compartimentos, em paralelo
+        # Cada unidade escaneada é gravada no inventário compartilhado com o delete_tags.py
+        tag_filter = tag_filter_key(matcher.signature, region)
+        if incremental:
+            scan_unit = cache.incremental_unit(regional.find_resources_of_type, tag_filter, full_scan_every,
+                                               recheck=regional.recheck_resource)
+        else:
+            scan_unit = cache.cached_unit(regional.find_resources_of_type, tag_filter, read=use_cache)
+        engine = ScanEngine(scan_unit, max_workers=workers,
+                            on_error=lambda comp_id, rtype, e: report_scan_error(comp_id, rtype, e, region))
+        # No modo streaming cada unidade é gravada assim que termina e nada fica retido
+        results = engine.scan(compartments, resource_types, on_unit=emit_unit if writer is not None else None,
+                              collect=writer is None)
+        return [resource for comp in compartments for resource in results[comp["id"]]], engine, {}
+
+    if discovery == "search":
+        description = "Buscando recursos via Resource Search"
+    else:
+        description = f"Buscando recursos em {len(compartments)} compartimentos ({workers} workers)"
+    if len(regions) > 1:
+        description += f" em {len(regions)} regiões"
+    try:
+        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
+            task = progress.add_task(f"{description}...", total=None)
+            region_results = fan_out(regions, scan_region)
+            found = tally.total + sum(len(r.value[0]) for r in region_results if r.error is None)
+            progress.update(task, description=f"Encontrados {found} recursos")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    for result in region_results:
+        if result.error is not None:
+            console.print(f"[red]Erro ao varrer a região {result.region}: {result.error}[/red]")
+            continue
+        resources, _, skipped_types = result.value
+        for search_type, count in sorted(skipped_types.items()):
+            console.print(f"[yellow]Aviso: {count} recurso(s) do tipo {search_type} ignorado(s) em {result.region} (tipo não suportado)[/yellow]")
+        if multi_region and resources:
+            console.print(f"\n[bold magenta]Região: {result.region}[/bold magenta]")
+        by_compartment = {comp["id"]: [] for comp in compartments}
+        for resource in resources:
+            by_compartment.setdefault(resource["compartment_id"], []).append(resource)
+        for comp_resources in by_compartment.values():
+            if comp_resources:
+                label = compartment_label(comp_resources[0])
+                console.print(f"\n[bold]Compartimento: {label}[/bold]")
+                scanner.display_resources_table(comp_resources, label)
+                for resource in comp_resources:
+                    tally.add(resource, label)
 
     # Resumo final
-    console.print(f"\n[bold]Resumo da análise (DRY-RUN):[/bold]")
+    console.print("\n[bold]Resumo da análise (DRY-RUN):[/bold]")
     console.print(f"[blue]Total de compartimentos analisados: {len(compartments)}[/blue]")
-    console.print(f"[red]Total de recursos com tag 'finops.customer: seduc-go': {len(total_resources)}[/red]")
+    indent = "  " if multi_region else ""
+    for result in region_results:
+        engine = result.value[1] if result.error is None else None
+        if multi_region:
+            status = "erro" if result.error is not None else f"{tally.by_region.get(result.region, 0)} recursos"
+            console.print(f"[blue]Região {result.region}: {status} em {result.wall_time:.2f}s[/blue]")
+        if engine is not None:
+            console.print(f"[blue]{indent}Varredura: {engine.stats.summary()}[/blue]")
+    if multi_region:
+        console.print(f"[blue]Regiões: {len(regions)} | tempo de parede: {max(r.wall_time for r in region_results):.2f}s | "
+                      f"soma das regiões: {sum(r.wall_time for r in region_results):.2f}s[/blue]")
+    if discovery == "list":
+        console.print(f"[blue]Inventário: {cache.summary()}[/blue]")
+    cache.close()
+    for line in scanner.page_stats.summary_lines():
+        console.print(f"  [dim]• {line}[/dim]")
+    console.print(f"[dim]Clientes OCI: {scanner.clients.summary()}[/dim]")
+    if writer is not None:
+        console.print(f"[blue]Saída {output_format}: {writer.count} recursos gravados em {output or 'stdout'}[/blue]")
+    console.print(f"[red]Total de recursos com tag '{matcher.label}': {tally.total}[/red]")
     
-    if total_resources:
-        console.print(f"\n[bold]Distribuição por compartimento:[/bold]")
-        for comp_name, resources in compartment_resources.items():
-            if resources:
-                console.print(f"  • {comp_name}: {len(resources)} recursos")
+    if tally.total:
+        if len(matcher.rules) > 1:
+            console.print("\n[bold]Resultados por regra:[/bold]")
+            for rule, by_type in tally.by_rule.items():
+                detail = ", ".join(f"{rtype}: {count}" for rtype, count in by_type.items())
+                console.print(f"  • {rule}: {sum(by_type.values())} recursos" + (f" ({detail})" if detail else ""))
+
+        console.print("\n[bold]Distribuição por compartimento:[/bold]")
+        for comp_name, count in tally.by_compartment.items():
+            console.print(f"  • {comp_name}: {count} recursos")
         
-        console.print(f"\n[yellow]Para remover essas tags, execute: python delete_tags.py[/yellow]")
+        if DEFAULT_RULE in (rule.spec for rule in matcher.rules):
+            console.print("\n[yellow]Para remover essas tags, execute: python delete_tags.py[/yellow]")
     else:
-        console.print(f"\n[green]✓[/green] Nenhum recurso com a tag 'finops.customer: seduc-go' foi encontrado.")
+        console.print(f"\n[green]✓[/green] Nenhum recurso com a tag '{matcher.label}' foi encontrado.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Backend OCI falso, em processo, para medir os scripts de tags em escala sem uma tenancy real.
+
+FakeTenancy gera uma árvore de compartimentos e um inventário sintético (todos os tipos do
+resource_registry, distribuídos entre regiões e compartimentos, uma fração com a tag alvo).
+FakeBackend responde às operações usadas pelos scripts (list_compartments,
+list_region_subscriptions, get_namespace e os list_/get_/update_ do registro) através de
+clientes falsos entregues ao ClientPool no lugar das classes do SDK (o search_client
+responde search_resources com a consulta de tag do search_discovery, sobre o mesmo
+inventário):
+
+  - latência por chamada, com jitter;
+  - paginação com limite de itens por página (next_page é o offset);
+  - rate limit por token bucket: acima de rate_limit chamadas/s a chamada recebe 429;
+  - falhas injetadas (HTTP 500) com a probabilidade failure_rate.
+
+Como no SDK, chamadas sem retry_strategy têm retry automático de 429 e 5xx (até
+SDK_RETRY_ATTEMPTS tentativas, com backoff exponencial proporcional à latência simulada);
+chamadas com oci.retry.NoneRetryStrategy (os updates do RemovalExecutor) recebem o erro
+direto. Todas as chamadas são contadas por operação.
+"""
+
+import copy
+import random
+import threading
+import time
+import types
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import oci
+
+from client_pool import CLIENT_FACTORIES
+from resource_registry import DEFAULT_RESOURCE_TYPES, REGISTRY, get_resource_type
+from search_discovery import FakeSearchClient
+
+SDK_RETRY_ATTEMPTS = 8
+
+TENANCY_ID = "ocid1.tenancy.oc1..fake"
+NAMESPACE = "faketenancy"
+TARGET_TAGS = {"finops": {"customer": "seduc-go"}}
+
+
+class FakeTenancy:
+    """Árvore de compartimentos e inventário sintéticos, determinísticos para uma mesma seed."""
+
+    def __init__(self, compartments: int = 500, resources: int = 100000, regions: Tuple[str, ...] = ("sa-saopaulo-1",),
+                 resource_types: Optional[List[str]] = None, tagged_ratio: float = 0.1, max_depth: int = 4, seed: int = 42):
+        rng = random.Random(seed)
+        self.regions = list(regions)
+        self.resource_types = list(resource_types or DEFAULT_RESOURCE_TYPES)
+        self.compartments = self._make_compartments(compartments, max_depth, rng)
+
+        # (região, list_method, compartment_id) -> itens em ordem de criação decrescente
+        self.listings: Dict[Tuple[str, str, str], List[Any]] = {}
+        # (região, get_method, identidade) -> item
+        self.items: Dict[Tuple[str, str, Tuple[Any, ...]], Any] = {}
+        self._original_tags: List[Tuple[Any, Dict[str, Any]]] = []
+        self.tagged = 0
+
+        compartment_ids = [TENANCY_ID] + [comp.id for comp in self.compartments]
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(resources):
+            region = self.regions[i % len(self.regions)]
+            rt = get_resource_type(self.resource_types[(i // len(self.regions)) % len(self.resource_types)])
+            compartment_id = rng.choice(compartment_ids)
+            tagged = rng.random() < tagged_ratio
+            self.tagged += tagged
+            item = self._make_item(i, rt.name, region, compartment_id, start + timedelta(minutes=i),
+                                   copy.deepcopy(TARGET_TAGS) if tagged else {"finops": {"customer": "outro"}})
+            self.listings.setdefault((region, rt.list_method, compartment_id), []).append(item)
+            key = tuple(getattr(item, attr) for attr in rt.identity.values())
+            self.items[(region, rt.get_method, key)] = item
+            self._original_tags.append((item, item.defined_tags))
+        for listing in self.listings.values():
+            listing.reverse()
+
+    @staticmethod
+    def _make_compartments(count: int, max_depth: int, rng: random.Random) -> List[Any]:
+        compartments = []
+        depth = {TENANCY_ID: 0}
+        for i in range(count):
+            candidates = [TENANCY_ID] + [comp.id for comp in compartments[-50:] if depth[comp.id] < max_depth]
+            parent = rng.choice(candidates)
+            comp = types.SimpleNamespace(id=f"ocid1.compartment.oc1..fake{i}", name=f"comp-{i}",
+                                         compartment_id=parent, lifecycle_state="ACTIVE")
+            depth[comp.id] = depth[parent] + 1
+            compartments.append(comp)
+        return compartments
+
+    @staticmethod
+    def _make_item(index: int, type_name: str, region: str, compartment_id: str, created: datetime,
+                   defined_tags: Dict[str, Any]) -> Any:
+        # Atributos de todos os tipos do registro (display_name, db_name, name/namespace dos buckets...)
+        name = f"{type_name.lower().replace(' ', '-')}-{index}"
+        return types.SimpleNamespace(
+            id=f"ocid1.fake.oc1.{region}.{index}", display_name=name, db_name=name, name=name, namespace=NAMESPACE,
+            lifecycle_state="AVAILABLE", compartment_id=compartment_id, time_created=created,
+            metadata=types.SimpleNamespace(time_created=created), defined_tags=defined_tags, freeform_tags={})
+
+    def reset_tags(self):
+        """Devolve a todos os recursos as tags geradas (para repetir a remoção)."""
+        for item, tags in self._original_tags:
+            item.defined_tags = tags
+
+
+class FakeBackend:
+    """Responde às chamadas dos clientes falsos, com latência, paginação, 429 e falhas."""
+
+    def __init__(self, tenancy: FakeTenancy, latency: float = 0.02, jitter: float = 0.25, page_size: int = 100,
+                 rate_limit: float = 0.0, failure_rate: float = 0.0, seed: int = 7):
+        self.tenancy = tenancy
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.rate_limit = rate_limit
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self.failed = 0
+        self.sdk_retries = 0
+        # operação -> tipo do registro
+        self._operations = {}
+        for rt in REGISTRY.values():
+            for method in (rt.list_method, rt.get_method, rt.update_method):
+                self._operations[method] = rt
+
+    def config(self) -> Dict[str, Any]:
+        """Configuração mínima para o ClientPool (os clientes falsos não assinam requisições)."""
+        # security_token_file faz o ClientPool não carregar uma chave privada para o Signer
+        return {"tenancy": TENANCY_ID, "region": self.tenancy.regions[0], "security_token_file": None}
+
+    def factories(self) -> Dict[str, Callable[..., Any]]:
+        """Fábricas para ClientPool(config, factories): um FakeClient por serviço e região."""
+        return {name: (lambda config, _name=name, **kwargs: FakeClient(self, _name, config["region"]))
+                for name in CLIENT_FACTORIES}
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled = self.failed = self.sdk_retries = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _take_token(self) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def call(self, operation: str, handler: Callable[[], Any], retry_strategy: Any = None) -> Any:
+        sdk_retry = not isinstance(retry_strategy, oci.retry.NoneRetryStrategy)
+        for attempt in range(SDK_RETRY_ATTEMPTS):
+            with self._lock:
+                self.calls[operation] += 1
+                allowed = self._take_token()
+                failed = allowed and self.failure_rate > 0 and self._rng.random() < self.failure_rate
+                jitter = self._rng.uniform(-self.jitter, self.jitter)
+                if not allowed:
+                    self.throttled += 1
+                elif failed:
+                    self.failed += 1
+            time.sleep(max(0.0, self.latency * (1 + jitter)))
+            if allowed and not failed:
+                return handler()
+            error = (oci.exceptions.ServiceError(429, "TooManyRequests", {}, "limite de requisições excedido")
+                     if not allowed else oci.exceptions.ServiceError(500, "InternalServerError", {}, "falha injetada"))
+            if not sdk_retry or attempt == SDK_RETRY_ATTEMPTS - 1:
+                raise error
+            with self._lock:
+                self.sdk_retries += 1
+            time.sleep(self.latency * (2 ** attempt) * random.random())
+        raise AssertionError("unreachable")
+
+    def search(self, region: str, query: str, page: Optional[str]) -> Any:
+        """search_resources sobre os recursos da região com tipo no Resource Search (tags atuais)."""
+        types, namespace, key, value = FakeSearchClient.parse_query(query)
+        matching = []
+        for (item_region, get_method, _), item in self.tenancy.items.items():
+            rt = self._operations[get_method]
+            if (item_region != region or not rt.search_type or rt.search_type.lower() not in types
+                    or (item.defined_tags or {}).get(namespace, {}).get(key) != value):
+                continue
+            matching.append(oci.resource_search.models.ResourceSummary(
+                resource_type=rt.search_type, identifier=item.id, compartment_id=item.compartment_id,
+                display_name=item.display_name, lifecycle_state=item.lifecycle_state,
+                defined_tags=copy.deepcopy(item.defined_tags), freeform_tags=dict(item.freeform_tags)))
+        return FakeSearchClient.page(matching, page, self.page_size)
+
+    def page(self, items: List[Any], page: Optional[str]) -> Any:
+        offset = int(page or 0)
+        end = offset + self.page_size
+        next_page = str(end) if end < len(items) else None
+        return _Response(items[offset:end], next_page)
+
+
+class _Response:
+    def __init__(self, data: Any, next_page: Optional[str] = None):
+        self.data = data
+        self.has_next_page = next_page is not None
+        self.next_page = next_page
+        self.headers: Dict[str, str] = {}
+
+
+class FakeClient:
+    """Cliente falso de um serviço em uma região; as operações são resolvidas por nome."""
+
+    def __init__(self, backend: FakeBackend, service: str, region: str):
+        self.backend = backend
+        self.service = service
+        self.region = region
+
+    def list_region_subscriptions(self, tenancy_id: str, **kwargs) -> _Response:
+        regions = self.backend.tenancy.regions
+        data = [types.SimpleNamespace(region_name=region, status="READY", is_home_region=(region == regions[0]))
+                for region in regions]
+        return self.backend.call("list_region_subscriptions", lambda: _Response(data),
+                                 kwargs.get("retry_strategy"))
+
+    def list_compartments(self, compartment_id: str, compartment_id_in_subtree: bool = False, page: Optional[str] = None,
+                          retry_strategy: Any = None, **kwargs) -> _Response:
+        compartments = self.backend.tenancy.compartments
+        if not compartment_id_in_subtree:
+            compartments = [comp for comp in compartments if comp.compartment_id == compartment_id]
+        return self.backend.call("list_compartments", lambda: self.backend.page(compartments, page),
+                                 retry_strategy)
+
+    def get_namespace(self, retry_strategy: Any = None, **kwargs) -> _Response:
+        return self.backend.call("get_namespace", lambda: _Response(NAMESPACE), retry_strategy)
+
+    def search_resources(self, search_details: Any, page: Optional[str] = None, retry_strategy: Any = None,
+                         **kwargs) -> Any:
+        return self.backend.call("search_resources",
+                                 lambda: self.backend.search(self.region, search_details.query, page), retry_strategy)
+
+    def __getattr__(self, operation: str) -> Callable[..., Any]:
+        rt = self.backend._operations.get(operation)
+        if rt is None or rt.client != self.service:
+            raise AttributeError(f"operação não simulada: {self.service}.{operation}")
+        if operation == rt.list_method:
+            return lambda **kwargs: self._list(rt, **kwargs)
+        if operation == rt.get_method:
+            return lambda **kwargs: self._get(rt, **kwargs)
+        return lambda **kwargs: self._update(rt, **kwargs)
+
+    def _list(self, rt: Any, compartment_id: str, page: Optional[str] = None, retry_strategy: Any = None, **kwargs) -> _Response:
+        items = self.backend.tenancy.listings.get((self.region, rt.list_method, compartment_id), [])
+        return self.backend.call(rt.list_method, lambda: self.backend.page(items, page), retry_strategy)
+
+    def _item(self, rt: Any, kwargs: Dict[str, Any]) -> Any:
+        key = tuple(kwargs[param] for param in rt.identity)
+        item = self.backend.tenancy.items.get((self.region, rt.get_method, key))
+        if item is None:
+            raise oci.exceptions.ServiceError(404, "NotAuthorizedOrNotFound", {}, f"{rt.name} não encontrado")
+        return item
+
+    def _get(self, rt: Any, retry_strategy: Any = None, **kwargs) -> _Response:
+        def handler() -> _Response:
+            item = self._item(rt, kwargs)
+            return _Response(types.SimpleNamespace(**dict(vars(item), defined_tags=copy.deepcopy(item.defined_tags))))
+        return self.backend.call(rt.get_method, handler, retry_strategy)
+
+    def _update(self, rt: Any, retry_strategy: Any = None, **kwargs) -> _Response:
+        def handler() -> _Response:
+            item = self._item(rt, kwargs)
+            item.defined_tags = copy.deepcopy(kwargs[rt.details_param].defined_tags)
+            return _Response(item)
+        return self.backend.call(rt.update_method, handler, retry_strategy)
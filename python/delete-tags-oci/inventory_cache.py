@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Cache local (SQLite) do inventário de recursos com a tag.
+
+O dry_run.py grava o resultado de cada unidade (compartimento, tipo de recurso) e o
+delete_tags.py reaproveita o mesmo snapshot enquanto ele estiver dentro do TTL, sem
+repetir a varredura da tenancy. O filtro de tag faz parte da chave, então snapshots de
+filtros diferentes não se misturam. O próprio dry-run só lê o cache quando pedido
+(--use-cache): por padrão ele sempre varre a tenancy e apenas grava o snapshot.
+
+Toda alteração feita pelo delete_tags.py (remoção ou --rollback) passa por invalidate(),
+que tira do inventário os recursos alterados para que nenhuma leitura posterior do cache
+apresente tags que já não existem.
+
+No modo incremental, cada unidade também guarda um watermark (instante da última
+varredura): as execuções seguintes listam ordenado por TIMECREATED decrescente, param
+no primeiro recurso anterior ao watermark e mesclam os recursos novos ao inventário.
+Os recursos que já estavam no inventário são relidos um a um (recheck): saem os que foram
+excluídos ou não satisfazem mais as regras, e as tags dos demais são atualizadas. Recursos
+antigos que passaram a ter a tag depois da última varredura não aparecem na listagem
+incremental nem no recheck; só a varredura completa, refeita a cada `full_scan_hours`, os
+encontra.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = "tag_inventory.sqlite"
+DEFAULT_TTL_HOURS = 12.0
+DEFAULT_FULL_SCAN_HOURS = 168.0
+
+# Sobreposição aplicada ao watermark para tolerar atraso de consistência da listagem
+WATERMARK_OVERLAP_SECONDS = 300
+
+# Pseudo-tipo usado para guardar a árvore de compartimentos no mesmo formato das unidades;
+# listas gravadas no formato antigo (sem caminho) ficam em outra chave e são ignoradas
+COMPARTMENTS_KEY = "Compartment"
+COMPARTMENTS_FILTER = "tree"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    compartment_id TEXT NOT NULL,
+    resource_type  TEXT NOT NULL,
+    tag_filter     TEXT NOT NULL,
+    scanned_at     REAL NOT NULL,
+    resources      TEXT NOT NULL,
+    PRIMARY KEY (compartment_id, resource_type, tag_filter)
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    compartment_id TEXT NOT NULL,
+    resource_type  TEXT NOT NULL,
+    tag_filter     TEXT NOT NULL,
+    created_after  REAL NOT NULL,
+    last_full_scan REAL NOT NULL,
+    PRIMARY KEY (compartment_id, resource_type, tag_filter)
+);
+"""
+
+
+def tag_filter_key(tag_filter: str, region: str) -> str:
+    """
+    tag_filter é a assinatura das regras de tag (ex.: "finops.customer=seduc-go"). Compartimentos
+    são globais: a região entra na chave para separar os snapshots de cada uma.
+    """
+    return f"{tag_filter}@{region}"
+
+
+class InventoryCache:
+    """Leitura/escrita thread-safe do inventário, com TTL e modo refresh."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_hours: float = DEFAULT_TTL_HOURS, refresh: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.full_units = 0
+        self.incremental_units = 0
+        self.rechecked = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        # Uma conexão compartilhada entre as threads do ScanEngine, serializada pelo lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, compartment_id: str, resource_type: str, tag_filter: str, ignore_ttl: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Recursos em cache para a unidade, ou None se ausente, expirado ou em modo refresh."""
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT scanned_at, resources FROM inventory "
+                "WHERE compartment_id = ? AND resource_type = ? AND tag_filter = ?",
+                (compartment_id, resource_type, tag_filter)
+            ).fetchone()
+        if row is None or (not ignore_ttl and time.time() - row[0] > self.ttl_seconds):
+            return None
+        return json.loads(row[1])
+
+    def put(self, compartment_id: str, resource_type: str, tag_filter: str, resources: List[Dict[str, Any]]):
+        payload = json.dumps(resources, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO inventory (compartment_id, resource_type, tag_filter, scanned_at, resources) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (compartment_id, resource_type, tag_filter, time.time(), payload)
+            )
+            self._conn.commit()
+
+    def invalidate(self, resources: List[Dict[str, Any]], tag_filter: Optional[str] = None) -> int:
+        """
+        Atualiza o inventário depois que as tags dos recursos foram alteradas. Cada recurso é
+        identificado por (region, compartment_id, type, id), os campos gravados pelos scripts.
+
+        tag_filter é a assinatura da regra cuja tag foi removida: nos snapshots dessa regra
+        os recursos saem da lista e o restante da unidade continua válido. Os snapshots de
+        outros filtros da mesma unidade (e todos eles quando tag_filter é None, como no
+        rollback, que devolve a tag) são descartados e refeitos na próxima varredura.
+        Retorna o número de snapshots alterados.
+        """
+        units: Dict[tuple, set] = {}
+        for resource in resources:
+            key = (resource.get("region"), resource["compartment_id"], resource["type"])
+            units.setdefault(key, set()).add(resource["id"])
+
+        changed = 0
+        with self._lock:
+            for (region, compartment_id, resource_type), ids in units.items():
+                suffix = f"@{region}"
+                keep = tag_filter_key(tag_filter, region) if tag_filter is not None else None
+                rows = self._conn.execute(
+                    "SELECT tag_filter, resources FROM inventory WHERE compartment_id = ? AND resource_type = ?",
+                    (compartment_id, resource_type)
+                ).fetchall()
+                for row_filter, payload in rows:
+                    if not row_filter.endswith(suffix):
+                        continue
+                    if row_filter == keep:
+                        cached = json.loads(payload)
+                        remaining = [resource for resource in cached if resource.get("id") not in ids]
+                        if len(remaining) == len(cached):
+                            continue
+                        # scanned_at é mantido: o TTL continua contando a partir da varredura
+                        self._conn.execute(
+                            "UPDATE inventory SET resources = ? "
+                            "WHERE compartment_id = ? AND resource_type = ? AND tag_filter = ?",
+                            (json.dumps(remaining, ensure_ascii=False, default=str),
+                             compartment_id, resource_type, row_filter)
+                        )
+                    else:
+                        self._conn.execute(
+                            "DELETE FROM inventory WHERE compartment_id = ? AND resource_type = ? AND tag_filter = ?",
+                            (compartment_id, resource_type, row_filter)
+                        )
+                    changed += 1
+            self._conn.commit()
+        return changed
+
+    def cached_unit(self, scan_unit: Callable[[str, str], List[Dict[str, Any]]], tag_filter: str,
+                    read: bool = True) -> Callable[[str, str], List[Dict[str, Any]]]:
+        """
+        Envolve a unidade de trabalho do ScanEngine: usa o cache quando válido e grava o que for
+        escaneado. Com read=False a unidade é sempre escaneada e o cache só é gravado.
+        """
+        def unit(compartment_id: str, resource_type: str) -> List[Dict[str, Any]]:
+            cached = self.get(compartment_id, resource_type, tag_filter) if read else None
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return cached
+            resources = scan_unit(compartment_id, resource_type)
+            self.put(compartment_id, resource_type, tag_filter, resources)
+            with self._lock:
+                self.misses += 1
+            return resources
+        return unit
+
+    def _get_watermark(self, compartment_id: str, resource_type: str, tag_filter: str) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT created_after, last_full_scan FROM watermarks "
+                "WHERE compartment_id = ? AND resource_type = ? AND tag_filter = ?",
+                (compartment_id, resource_type, tag_filter)
+            ).fetchone()
+
+    def _set_watermark(self, compartment_id: str, resource_type: str, tag_filter: str, created_after: float, last_full_scan: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (compartment_id, resource_type, tag_filter, created_after, last_full_scan) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (compartment_id, resource_type, tag_filter, created_after, last_full_scan)
+            )
+            self._conn.commit()
+
+    def incremental_unit(self, scan_unit: Callable[..., List[Dict[str, Any]]], tag_filter: str,
+                         full_scan_hours: float = DEFAULT_FULL_SCAN_HOURS,
+                         recheck: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None
+                         ) -> Callable[[str, str], List[Dict[str, Any]]]:
+        """
+        Envolve a unidade do ScanEngine no modo incremental. scan_unit precisa aceitar
+        created_after (datetime UTC), como o find_resources_of_type dos scripts.
+
+        recheck(resource) relê um recurso do inventário e devolve a versão atual, ou None se
+        ele foi excluído ou não satisfaz mais as regras. Sem recheck os recursos em cache são
+        mantidos como estavam até a próxima varredura completa.
+        """
+        def unit(compartment_id: str, resource_type: str) -> List[Dict[str, Any]]:
+            started = time.time()
+            mark = self._get_watermark(compartment_id, resource_type, tag_filter)
+            base = self.get(compartment_id, resource_type, tag_filter, ignore_ttl=True)
+
+            if mark is None or base is None or started - mark[1] >= full_scan_hours * 3600:
+                resources = scan_unit(compartment_id, resource_type)
+                last_full_scan = started
+                counter = "full_units"
+            else:
+                created_after = datetime.fromtimestamp(mark[0], tz=timezone.utc)
+                new = scan_unit(compartment_id, resource_type, created_after=created_after)
+                if recheck is not None:
+                    listed = {resource["id"] for resource in new}
+                    current = [recheck(resource) for resource in base if resource["id"] not in listed]
+                    kept = [resource for resource in current if resource is not None]
+                    with self._lock:
+                        self.rechecked += len(current)
+                        self.dropped += len(current) - len(kept)
+                    base = kept
+                # Recursos da sobreposição aparecem nas duas listas: a versão nova prevalece
+                merged = {resource["id"]: resource for resource in base}
+                merged.update((resource["id"], resource) for resource in new)
+                resources = list(merged.values())
+                last_full_scan = mark[1]
+                counter = "incremental_units"
+
+            # Só avança o watermark depois que a unidade terminou sem erro
+            self.put(compartment_id, resource_type, tag_filter, resources)
+            self._set_watermark(compartment_id, resource_type, tag_filter,
+                                started - WATERMARK_OVERLAP_SECONDS, last_full_scan)
+            with self._lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+            return resources
+        return unit
+
+    def cached_compartments(self, tenancy_id: str, fetch: Callable[[], List[Dict[str, Any]]],
+                            read: bool = True) -> List[Dict[str, Any]]:
+        """
+        Lista de compartimentos a partir do cache ou de fetch(); listas vazias (erro) não são
+        gravadas. Com read=False fetch() é sempre chamado e o resultado só é gravado.
+        """
+        cached = self.get(tenancy_id, COMPARTMENTS_KEY, COMPARTMENTS_FILTER) if read else None
+        if cached is not None:
+            return cached
+        compartments = fetch()
+        if compartments:
+            self.put(tenancy_id, COMPARTMENTS_KEY, COMPARTMENTS_FILTER, compartments)
+        return compartments
+
+    def summary(self) -> str:
+        if self.full_units or self.incremental_units:
+            return (f"cache {self.path}: {self.incremental_units} unidades incrementais, "
+                    f"{self.full_units} varreduras completas, {self.rechecked} recursos relidos "
+                    f"({self.dropped} removidos do inventário)")
+        return f"cache {self.path}: {self.hits} unidades reaproveitadas, {self.misses} escaneadas"
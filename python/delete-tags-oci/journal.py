@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Journal append-only (JSONL) das remoções de tags.
+
+Cada linha é um evento:
+  - run:        início de uma execução (seguido pelos eventos planned dela)
+  - planned:    recurso selecionado para remoção, com o mapa defined_tags ANTES da alteração
+  - removed / failed:   resultado da remoção
+  - skipped:    a tag já não estava no recurso na reverificação, nada foi alterado
+  - resume / rollback:  marcadores de execuções --resume e --rollback
+  - restored / restore_failed: resultado da restauração das tags originais
+  - verified / still_tagged / verify_failed: releitura do recurso depois da remoção;
+    still_tagged devolve o recurso aos pendentes do --resume
+
+Como o arquivo só recebe appends, uma interrupção no meio da execução perde no máximo
+a linha que estava sendo escrita; o replay dos eventos reconstrói o estado.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_JOURNAL_PATH = "tag_removal_journal.jsonl"
+
+# Campos do recurso persistidos no journal (o suficiente para atualizar sem reescanear)
+RESOURCE_FIELDS = ("type", "id", "name", "lifecycle_state", "compartment_id", "region", "defined_tags", "identity")
+
+
+class RemovalJournal:
+    """Escrita thread-safe e replay do journal de remoções."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _append(self, event: str, resource: Optional[Dict[str, Any]] = None, **extra):
+        entry = {"ts": time.time(), "event": event}
+        if resource is not None:
+            entry.update({field: resource.get(field) for field in RESOURCE_FIELDS})
+        entry.update(extra)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def start_run(self, resources: List[Dict[str, Any]]) -> str:
+        """Registra uma nova execução e o plano completo (com as tags originais)."""
+        run_id = uuid.uuid4().hex
+        self._append("run", run_id=run_id, total=len(resources))
+        for resource in resources:
+            self._append("planned", resource, run_id=run_id)
+        return run_id
+
+    def mark(self, event: str, **extra):
+        """Marcadores de execução sem recurso associado (resume, rollback)."""
+        self._append(event, **extra)
+
+    def record(self, event: str, resource: Dict[str, Any], error: Optional[Exception] = None, **extra):
+        """Registra o resultado de um recurso (removed, skipped, failed, restored, restore_failed, verified...)."""
+        self._append(event, resource, error=str(error) if error else None, **extra)
+
+    def _events(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Linha truncada por uma interrupção durante a escrita
+                    continue
+
+    @staticmethod
+    def _key(entry: Dict[str, Any]) -> tuple:
+        # Identificadores sem OCID (ex.: buckets, namespace/nome) podem se repetir entre regiões
+        return entry.get("region"), entry["id"]
+
+    @staticmethod
+    def _resource(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: entry.get(field) for field in RESOURCE_FIELDS}
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Recursos planejados na última execução que ainda não tiveram a tag removida (ou confirmada)."""
+        planned: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        done = set()
+        for entry in self._events():
+            if entry["event"] == "run":
+                planned.clear()
+                done.clear()
+            elif entry["event"] == "planned":
+                planned[self._key(entry)] = self._resource(entry)
+            elif entry["event"] in ("removed", "skipped"):
+                done.add(self._key(entry))
+            elif entry["event"] == "still_tagged":
+                # A remoção foi aceita, mas a verificação ainda encontrou a tag
+                done.discard(self._key(entry))
+        return [resource for key, resource in planned.items() if key not in done]
+
+    def removed(self) -> List[Dict[str, Any]]:
+        """
+        Recursos com tag removida e ainda não restaurados, com o defined_tags original.
+
+        Se um recurso foi alterado mais de uma vez, vale o mapa registrado na primeira
+        remoção, que é o estado anterior a qualquer alteração feita por este script.
+        """
+        to_restore: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for entry in self._events():
+            if entry["event"] == "removed" and self._key(entry) not in to_restore:
+                to_restore[self._key(entry)] = self._resource(entry)
+            elif entry["event"] == "restored":
+                to_restore.pop(self._key(entry), None)
+        return list(to_restore.values())
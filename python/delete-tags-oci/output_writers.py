@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Saída em streaming dos recursos encontrados pelo dry-run (jsonl, csv ou parquet).
+
+Cada recurso é gravado assim que a unidade (compartimento, tipo de recurso) que o encontrou
+termina, sem acumular a varredura em memória: ferramentas que consomem a saída podem
+começar a processar antes do fim da varredura. Os writers são thread-safe, pois recebem
+recursos das threads do ScanEngine e de várias regiões ao mesmo tempo.
+
+O formato parquet depende do pyarrow (opcional, `pip install pyarrow`); as linhas são
+agrupadas em row groups de tamanho fixo, o que mantém a memória constante.
+"""
+
+import csv
+import json
+import sys
+import threading
+from typing import Any, Dict, List, Optional, TextIO
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+# Colunas da saída, na ordem gravada
+COLUMNS = ("region", "compartment_path", "compartment_id", "type", "id", "name", "lifecycle_state",
+           "rules", "defined_tags", "freeform_tags")
+
+PARQUET_ROW_GROUP = 1000
+
+
+def resource_row(resource: Dict[str, Any], compartment_path: str) -> Dict[str, Any]:
+    """Linha de saída de um recurso (as tags são o snapshot lido na varredura)."""
+    return {
+        "region": resource.get("region"),
+        "compartment_path": compartment_path,
+        "compartment_id": resource["compartment_id"],
+        "type": resource["type"],
+        "id": resource["id"],
+        "name": resource["name"],
+        "lifecycle_state": resource["lifecycle_state"],
+        "rules": list(resource.get("rules", [])),
+        "defined_tags": resource.get("defined_tags") or {},
+        "freeform_tags": resource.get("freeform_tags") or {},
+    }
+
+
+class ResourceWriter:
+    """Base dos writers: serializa as escritas e conta as linhas gravadas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def write(self, row: Dict[str, Any]):
+        with self._lock:
+            self._write(row)
+            self.count += 1
+
+    def _write(self, row: Dict[str, Any]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlWriter(ResourceWriter):
+    def __init__(self, stream: TextIO):
+        super().__init__()
+        self.stream = stream
+
+    def _write(self, row: Dict[str, Any]):
+        self.stream.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class CsvWriter(ResourceWriter):
+    """CSV com cabeçalho; rules e tags vão como JSON dentro da célula."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__()
+        self.stream = stream
+        self._writer = csv.writer(stream)
+        self._writer.writerow(COLUMNS)
+
+    def _write(self, row: Dict[str, Any]):
+        self._writer.writerow([
+            json.dumps(row[column], ensure_ascii=False, default=str) if column in ("rules", "defined_tags", "freeform_tags")
+            else row[column]
+            for column in COLUMNS
+        ])
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class ParquetWriter(ResourceWriter):
+    """Parquet em row groups de PARQUET_ROW_GROUP linhas; rules é uma lista e as tags, JSON."""
+
+    def __init__(self, path: str, row_group: int = PARQUET_ROW_GROUP):
+        super().__init__()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([
+            (column, pa.list_(pa.string()) if column == "rules" else pa.string()) for column in COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self.row_group = row_group
+        self._buffer: List[Dict[str, Any]] = []
+
+    def _write(self, row: Dict[str, Any]):
+        row = dict(row)
+        for column in ("defined_tags", "freeform_tags"):
+            row[column] = json.dumps(row[column], ensure_ascii=False, default=str)
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self.schema))
+            self._buffer = []
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._writer.close()
+
+
+def open_writer(output_format: str, path: Optional[str]) -> ResourceWriter:
+    """
+    Abre o writer do formato pedido. jsonl e csv gravam na saída padrão quando path é None
+    ou "-"; parquet exige um arquivo. Lança ValueError para combinações inválidas e
+    ImportError quando o pyarrow não está instalado.
+    """
+    to_stdout = path in (None, "-")
+    if output_format == "parquet":
+        if to_stdout:
+            raise ValueError("o formato parquet exige --output com o caminho do arquivo")
+        return ParquetWriter(path)
+    stream = sys.stdout if to_stdout else open(path, "w", encoding="utf-8", newline="")
+    if output_format == "jsonl":
+        return JsonlWriter(stream)
+    if output_format == "csv":
+        return CsvWriter(stream)
+    raise ValueError(f"formato não suportado: {output_format}")
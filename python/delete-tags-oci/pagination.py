@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Paginação completa e em streaming para as chamadas list_* da OCI.
+
+As respostas da OCI trazem apenas uma página em response.data; as páginas seguintes
+são obtidas repassando response.next_page no parâmetro page enquanto has_next_page
+for verdadeiro (o mesmo protocolo usado em oci.pagination). Os geradores abaixo
+entregam os itens página a página, então quem consome só mantém em memória a página
+atual, e registram a quantidade de páginas e a latência por tipo de recurso.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class PageStats:
+    """Contador thread-safe de páginas, itens e latência por rótulo (tipo de recurso)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def record(self, label: str, items: int, latency: float):
+        with self._lock:
+            counter = self._counters.setdefault(label, {"pages": 0, "items": 0, "latency": 0.0})
+            counter["pages"] += 1
+            counter["items"] += items
+            counter["latency"] += latency
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {label: dict(counter) for label, counter in self._counters.items()}
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for label, counter in sorted(self.snapshot().items()):
+            avg = counter["latency"] / counter["pages"] if counter["pages"] else 0.0
+            lines.append(f"{label}: {counter['pages']} páginas, {counter['items']} itens, "
+                         f"{counter['latency']:.2f}s ({avg * 1000:.0f} ms/página)")
+        return lines
+
+
+def iter_pages(list_fn: Callable[..., Any], *args, label: str = "", stats: Optional[PageStats] = None, **kwargs) -> Iterator[List[Any]]:
+    """Chama list_fn repetidamente seguindo next_page e entrega cada página (lista de itens)."""
+    kwargs = dict(kwargs)
+    while True:
+        start = time.perf_counter()
+        response = list_fn(*args, **kwargs)
+        # Algumas operações (ex.: search_resources) devolvem uma *Collection com .items
+        items = getattr(response.data, "items", response.data)
+        if stats is not None:
+            stats.record(label or getattr(list_fn, "__name__", "list"), len(items), time.perf_counter() - start)
+        yield items
+        if not response.has_next_page:
+            return
+        kwargs["page"] = response.next_page
+
+
+def paginate(list_fn: Callable[..., Any], *args, label: str = "", stats: Optional[PageStats] = None, **kwargs) -> Iterator[Any]:
+    """Como iter_pages, mas entrega os itens um a um."""
+    for page in iter_pages(list_fn, *args, label=label, stats=stats, **kwargs):
+        for item in page:
+            yield item
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Varredura de várias regiões em paralelo.
+
+Cada região é varrida por inteiro (com o seu próprio ScanEngine e clientes da região no
+ClientPool) em uma thread dedicada; o tempo total fica próximo ao da região mais lenta em
+vez da soma de todas. Os resultados voltam na ordem das regiões recebidas.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+
+def subscribed_regions(identity_client: Any, tenancy_id: str) -> List[str]:
+    """Regiões assinadas e prontas da tenancy, com a home region primeiro."""
+    subscriptions = identity_client.list_region_subscriptions(tenancy_id).data
+    ready = [s for s in subscriptions if s.status == "READY"]
+    ready.sort(key=lambda s: (not s.is_home_region, s.region_name))
+    return [s.region_name for s in ready]
+
+
+def resolve_regions(spec: Optional[str], config_region: str, list_subscribed: Callable[[], List[str]]) -> List[str]:
+    """
+    Converte o valor de --regions: vazio usa a região do ~/.oci/config, "all" todas as
+    regiões assinadas e, caso contrário, a lista separada por vírgula.
+    """
+    if not spec:
+        return [config_region]
+    if spec == "all":
+        return list_subscribed()
+    regions = []
+    for region in (r.strip() for r in spec.split(",")):
+        if region and region not in regions:
+            regions.append(region)
+    return regions
+
+
+class RegionResult:
+    """Resultado (ou erro) da varredura de uma região e o tempo que ela levou."""
+
+    def __init__(self, region: str, value: Any = None, wall_time: float = 0.0, error: Optional[Exception] = None):
+        self.region = region
+        self.value = value
+        self.wall_time = wall_time
+        self.error = error
+
+
+def fan_out(regions: List[str], scan_region: Callable[[str], Any]) -> List[RegionResult]:
+    """Executa scan_region(região) para todas as regiões em paralelo."""
+    def run(region: str) -> RegionResult:
+        start = time.perf_counter()
+        try:
+            value = scan_region(region)
+        except Exception as e:
+            return RegionResult(region, wall_time=time.perf_counter() - start, error=e)
+        return RegionResult(region, value, time.perf_counter() - start)
+
+    if len(regions) == 1:
+        return [run(regions[0])]
+    with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+        return list(executor.map(run, regions))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Executor concorrente para as atualizações de tags, sensível a rate limit.
+
+As atualizações rodam em um pool de threads, mas o número de chamadas simultâneas
+é controlado por um limitador AIMD (additive increase / multiplicative decrease):
+cada janela de sucessos sem throttling aumenta o limite em 1, e cada HTTP 429
+divide o limite pela metade. Chamadas que recebem 429 são repetidas com backoff
+exponencial com jitter ("full jitter"), liberando a vaga enquanto esperam.
+
+Se update_fn devolver False o recurso é contado como "skipped" (nada a alterar).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_INITIAL_CONCURRENCY = 4
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """HTTP 429 (TooManyRequests) da OCI, reconhecido pelo atributo status do ServiceError."""
+    return getattr(error, "status", None) == 429
+
+
+class AdaptiveLimiter:
+    """Semáforo com limite ajustável em tempo de execução (AIMD)."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = DEFAULT_MAX_CONCURRENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.peak = self.limit
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        """Aumento aditivo: +1 a cada `limit` sucessos consecutivos."""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self.peak = max(self.peak, self.limit)
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_throttle(self):
+        """Redução multiplicativa: o limite cai pela metade."""
+        with self._cond:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._successes = 0
+
+
+class RemovalStats:
+    """Resumo da execução: sucessos, erros, retries e vazão final."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.retries = 0
+        self.throttled = 0
+        self.wall_time = 0.0
+        self.final_concurrency = 0
+        self.peak_concurrency = 0
+
+    def add(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    @property
+    def updates_per_second(self) -> float:
+        if self.wall_time <= 0:
+            return 0.0
+        return (self.succeeded + self.failed + self.skipped) / self.wall_time
+
+    def summary(self) -> str:
+        return (f"{self.updates_per_second:.1f} atualizações/s | retries: {self.retries} | "
+                f"429 recebidos: {self.throttled} | concorrência final/pico: "
+                f"{self.final_concurrency}/{self.peak_concurrency}")
+
+
+class RemovalExecutor:
+    """Aplica update_fn a cada recurso em paralelo, com retry em 429 e concorrência adaptativa."""
+
+    def __init__(self, update_fn: Callable[[Dict[str, Any]], Any],
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+                 max_retries: int = 6, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        update_fn deve lançar a exceção da OCI em caso de falha; 429 é repetido aqui,
+        qualquer outro erro conta como falha definitiva do recurso.
+        """
+        self.update_fn = update_fn
+        self.max_concurrency = max_concurrency
+        self.limiter = AdaptiveLimiter(initial_concurrency, maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = RemovalStats()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _process(self, resource: Dict[str, Any], on_done: Optional[Callable[[Dict[str, Any], str, Optional[Exception]], None]]):
+        error: Optional[Exception] = None
+        result = None
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                result = self.update_fn(resource)
+                error = None
+            except Exception as e:
+                error = e
+            finally:
+                self.limiter.release()
+
+            if error is None:
+                self.limiter.on_success()
+                break
+            if not is_throttling_error(error):
+                break
+            self.limiter.on_throttle()
+            self.stats.add("throttled")
+            if attempt == self.max_retries:
+                break
+            self.stats.add("retries")
+            time.sleep(self._backoff(attempt))
+
+        if error is not None:
+            outcome = "failed"
+        elif result is False:
+            outcome = "skipped"
+        else:
+            outcome = "succeeded"
+        self.stats.add(outcome)
+        if on_done is not None:
+            on_done(resource, outcome, error)
+
+    def run(self, resources: List[Dict[str, Any]],
+            on_done: Optional[Callable[[Dict[str, Any], str, Optional[Exception]], None]] = None) -> RemovalStats:
+        """
+        Processa todos os recursos; on_done(resource, outcome, error) é chamado ao final de
+        cada um, com outcome em "succeeded", "skipped" ou "failed".
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = [executor.submit(self._process, resource, on_done) for resource in resources]
+            for future in futures:
+                future.result()
+        self.stats.wall_time = time.perf_counter() - start
+        self.stats.final_concurrency = self.limiter.limit
+        self.stats.peak_concurrency = self.limiter.peak
+        return self.stats
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Registro declarativo dos tipos de recurso suportados pelos scripts de tags.
+
+Cada tipo descreve, como dados, qual cliente e quais operações da OCI usar para listar,
+ler e atualizar o recurso, o modelo de detalhes da atualização e os campos de identidade
+exigidos pelas operações get/update. O OCITagScanner, o OCITagRemover e o ScanEngine
+tratam todos os tipos da mesma forma a partir destas entradas; para suportar um tipo
+novo basta registrar mais uma entrada.
+"""
+
+from collections import OrderedDict
+from operator import attrgetter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import oci
+
+
+class ResourceType:
+    """Descrição de um tipo de recurso da OCI com defined tags atualizáveis."""
+
+    def __init__(self, name: str, client: str, list_method: str, get_method: str, update_method: str,
+                 details_param: str, details_model: Any, identity: Dict[str, str],
+                 id_attrs: Tuple[str, ...] = ("id",), name_attr: str = "display_name",
+                 sort_by: Optional[str] = None, created_attr: str = "time_created", list_context: Optional[Dict[str, str]] = None,
+                 list_kwargs: Optional[Dict[str, Any]] = None, search_type: Optional[str] = None):
+        """
+        name:          nome exibido e usado como chave (ex.: "Instance")
+        client:        atributo do scanner/remover com o cliente OCI (ex.: "compute_client")
+        list_method / get_method / update_method: operações do cliente
+        details_param: nome do parâmetro de detalhes no update (ex.: "update_instance_details")
+        details_model: classe do modelo de detalhes (ex.: oci.core.models.UpdateInstanceDetails)
+        identity:      {parâmetro do get/update: atributo do item listado}
+        id_attrs:      atributos que compõem o identificador exibido (unidos por "/")
+        sort_by:       valor de sort_by para ordenar por data de criação (None se não suportado)
+        created_attr:  caminho (com pontos) do atributo de data de criação no item listado
+        list_context:  {parâmetro da listagem: atributo do scanner} (ex.: namespace do Object Storage)
+        list_kwargs:   parâmetros fixos da listagem
+        search_type:   tipo retornado pelo Resource Search, se a identidade puder ser montada a partir dele
+        """
+        self.name = name
+        self.client = client
+        self.list_method = list_method
+        self.get_method = get_method
+        self.update_method = update_method
+        self.details_param = details_param
+        self.details_model = details_model
+        self.identity = identity
+        self.id_attrs = id_attrs
+        self.name_attr = name_attr
+        self.sort_by = sort_by
+        self.created_attr = created_attr.split(".")
+        self.list_context = list_context or {}
+        self.list_kwargs = list_kwargs or {}
+        self.search_type = search_type
+        # Getters pré-compilados: to_resource roda uma vez por recurso listado
+        self._get_id = attrgetter(*id_attrs)
+        self._join_id = len(id_attrs) > 1
+        self._get_name = attrgetter(name_attr)
+        # Quando a identidade é só o OCID ela não é copiada em cada recurso: identity_kwargs a
+        # monta a partir de resource["id"] no momento do get/update
+        self._identity_items = ([] if list(identity.values()) == ["id"] else
+                                [(param, attrgetter(attr)) for param, attr in identity.items()])
+
+    def list_call_kwargs(self, owner: Any, compartment_id: str, created_after: Optional[datetime] = None) -> Dict[str, Any]:
+        kwargs = dict(self.list_kwargs, compartment_id=compartment_id)
+        for param, attr in self.list_context.items():
+            kwargs[param] = getattr(owner, attr)
+        if created_after is not None and self.sort_by:
+            kwargs.update(sort_by=self.sort_by, sort_order="DESC")
+        return kwargs
+
+    def time_created(self, item: Any) -> Optional[datetime]:
+        value = item
+        for attr in self.created_attr:
+            value = getattr(value, attr, None)
+            if value is None:
+                return None
+        return value
+
+    def to_resource(self, item: Any, compartment_id: str, region: Optional[str] = None) -> Dict[str, Any]:
+        """Converte o item listado no dicionário usado pelos scripts, journal e inventário."""
+        resource_id = self._get_id(item)
+        if self._join_id:
+            resource_id = "/".join(resource_id)
+        return {
+            "type": self.name,
+            "id": resource_id,
+            "name": self._get_name(item),
+            # Alguns resumos (ex.: buckets) não têm lifecycle_state
+            "lifecycle_state": getattr(item, "lifecycle_state", None) or "-",
+            "compartment_id": compartment_id,
+            "region": region,
+            "defined_tags": item.defined_tags,
+            # None quando o recurso não tem freeform tags (os writers tratam como {})
+            "freeform_tags": getattr(item, "freeform_tags", None),
+            "identity": {param: get(item) for param, get in self._identity_items} if self._identity_items else None
+        }
+
+    def identity_kwargs(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        # Tipos identificados só pelo OCID (e entradas anteriores ao registro) não têm "identity"
+        identity = resource.get("identity")
+        if identity:
+            return dict(identity)
+        return {next(iter(self.identity)): resource["id"]}
+
+    def get(self, client: Any, resource: Dict[str, Any], **kwargs) -> Any:
+        return getattr(client, self.get_method)(**self.identity_kwargs(resource), **kwargs).data
+
+    def update(self, client: Any, resource: Dict[str, Any], defined_tags: Dict[str, Any], **kwargs) -> Any:
+        details = self.details_model(defined_tags=defined_tags)
+        call_kwargs = self.identity_kwargs(resource)
+        call_kwargs[self.details_param] = details
+        return getattr(client, self.update_method)(**call_kwargs, **kwargs)
+
+
+REGISTRY: "OrderedDict[str, ResourceType]" = OrderedDict()
+
+
+def register(resource_type: ResourceType) -> ResourceType:
+    REGISTRY[resource_type.name] = resource_type
+    return resource_type
+
+
+def get_resource_type(name: str) -> ResourceType:
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"tipo de recurso não suportado: {name}")
+
+
+def parse_resource_types(value: str) -> List[str]:
+    """Converte o valor de --types ("default", "all" ou lista separada por vírgula)."""
+    if value == "default":
+        return list(DEFAULT_RESOURCE_TYPES)
+    if value == "all":
+        return list(REGISTRY)
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    for name in names:
+        get_resource_type(name)
+    return names
+
+
+register(ResourceType(
+    "Instance", "compute_client", "list_instances", "get_instance", "update_instance",
+    "update_instance_details", oci.core.models.UpdateInstanceDetails, {"instance_id": "id"},
+    sort_by="TIMECREATED", search_type="Instance"))
+register(ResourceType(
+    "Volume", "blockstorage_client", "list_volumes", "get_volume", "update_volume",
+    "update_volume_details", oci.core.models.UpdateVolumeDetails, {"volume_id": "id"},
+    sort_by="TIMECREATED", search_type="Volume"))
+register(ResourceType(
+    "VCN", "network_client", "list_vcns", "get_vcn", "update_vcn",
+    "update_vcn_details", oci.core.models.UpdateVcnDetails, {"vcn_id": "id"},
+    sort_by="TIMECREATED", search_type="Vcn"))
+register(ResourceType(
+    "Subnet", "network_client", "list_subnets", "get_subnet", "update_subnet",
+    "update_subnet_details", oci.core.models.UpdateSubnetDetails, {"subnet_id": "id"},
+    sort_by="TIMECREATED", search_type="Subnet"))
+register(ResourceType(
+    "Load Balancer", "loadbalancer_client", "list_load_balancers", "get_load_balancer", "update_load_balancer",
+    "update_load_balancer_details", oci.load_balancer.models.UpdateLoadBalancerDetails, {"load_balancer_id": "id"},
+    sort_by="TIMECREATED", search_type="LoadBalancer"))
+register(ResourceType(
+    "Database", "database_client", "list_databases", "get_database", "update_database",
+    "update_database_details", oci.database.models.UpdateDatabaseDetails, {"database_id": "id"},
+    # Databases não têm display_name, apenas db_name
+    name_attr="db_name", sort_by="TIMECREATED", search_type="Database"))
+
+# Tipos suportados, mas fora da varredura padrão (use --types all ou a lista desejada)
+register(ResourceType(
+    "Boot Volume", "blockstorage_client", "list_boot_volumes", "get_boot_volume", "update_boot_volume",
+    "update_boot_volume_details", oci.core.models.UpdateBootVolumeDetails, {"boot_volume_id": "id"},
+    search_type="BootVolume"))
+register(ResourceType(
+    "Bucket", "objectstorage_client", "list_buckets", "get_bucket", "update_bucket",
+    "update_bucket_details", oci.object_storage.models.UpdateBucketDetails,
+    {"namespace_name": "namespace", "bucket_name": "name"},
+    id_attrs=("namespace", "name"), name_attr="name",
+    list_context={"namespace_name": "object_storage_namespace"}, list_kwargs={"fields": ["tags"]}))
+register(ResourceType(
+    "Autonomous Database", "database_client", "list_autonomous_databases", "get_autonomous_database",
+    "update_autonomous_database", "update_autonomous_database_details",
+    oci.database.models.UpdateAutonomousDatabaseDetails, {"autonomous_database_id": "id"},
+    sort_by="TIMECREATED", search_type="AutonomousDatabase"))
+register(ResourceType(
+    "OKE Cluster", "containerengine_client", "list_clusters", "get_cluster", "update_cluster",
+    "update_cluster_details", oci.container_engine.models.UpdateClusterDetails, {"cluster_id": "id"},
+    name_attr="name", sort_by="TIME_CREATED", created_attr="metadata.time_created", search_type="ClustersCluster"))
+
+DEFAULT_RESOURCE_TYPES = ["Instance", "Volume", "VCN", "Subnet", "Load Balancer", "Database"]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Motor de varredura concorrente usado pelo OCITagScanner e pelo OCITagRemover.
+
+Cada par (compartimento, tipo de recurso) vira uma unidade de trabalho independente,
+executada em um pool de threads limitado. Os resultados são reagrupados na ordem
+original dos compartimentos e dos tipos, de forma que a saída é a mesma da varredura
+sequencial, independente da ordem em que as chamadas à API terminam.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from resource_registry import DEFAULT_RESOURCE_TYPES
+
+DEFAULT_WORKERS = 8
+
+
+class ScanStats:
+    """Acumula métricas da varredura: tempo de parede vs. tempo somado de API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.units = 0
+        self.errors = 0
+        self.api_time = 0.0
+        self.wall_time = 0.0
+
+    def record_unit(self, duration: float, failed: bool = False):
+        with self._lock:
+            self.units += 1
+            self.errors += int(failed)
+            self.api_time += duration
+
+    @property
+    def speedup(self) -> float:
+        if self.wall_time <= 0:
+            return 1.0
+        return self.api_time / self.wall_time
+
+    def summary(self) -> str:
+        return (f"{self.units} unidades ({self.errors} com erro) | tempo de parede: {self.wall_time:.2f}s | "
+                f"tempo somado de API: {self.api_time:.2f}s | speedup: {self.speedup:.1f}x")
+
+
+class ScanEngine:
+    """Distribui unidades (compartimento, tipo de recurso) em um pool de threads."""
+
+    def __init__(self, scan_unit: Callable[[str, str], List[Dict[str, Any]]], max_workers: int = DEFAULT_WORKERS,
+                 on_error: Optional[Callable[[str, str, Exception], None]] = None):
+        """
+        scan_unit recebe (compartment_id, resource_type) e devolve a lista de recursos
+        encontrados. Erros de API devem ser propagados: a unidade com erro contribui com
+        uma lista vazia, é contabilizada e repassada a on_error(compartment_id, resource_type, erro).
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers deve ser >= 1")
+        self.scan_unit = scan_unit
+        self.max_workers = max_workers
+        self.on_error = on_error
+        self.stats = ScanStats()
+
+    def _run_unit(self, compartment_id: str, resource_type: str,
+                  on_unit: Optional[Callable[[str, str, List[Dict[str, Any]]], None]], collect: bool) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            resources = self.scan_unit(compartment_id, resource_type)
+        except Exception as e:
+            self.stats.record_unit(time.perf_counter() - start, failed=True)
+            if self.on_error is not None:
+                self.on_error(compartment_id, resource_type, e)
+            return []
+        self.stats.record_unit(time.perf_counter() - start)
+        if on_unit is not None:
+            on_unit(compartment_id, resource_type, resources)
+        return resources if collect else []
+
+    def scan(self, compartments: List[Dict[str, Any]], resource_types: List[str] = None,
+             on_unit: Optional[Callable[[str, str, List[Dict[str, Any]]], None]] = None,
+             collect: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Varre todos os compartimentos e retorna {compartment_id: [recursos]}, na ordem
+        dos compartimentos recebidos e, dentro de cada um, na ordem de resource_types.
+
+        on_unit(compartment_id, resource_type, recursos) é chamado na thread do worker assim
+        que cada unidade termina, na ordem de conclusão. Com collect=False os recursos não
+        são retidos (as listas do retorno ficam vazias) e a memória não cresce com a varredura.
+        """
+        resource_types = resource_types or DEFAULT_RESOURCE_TYPES
+        units: List[Tuple[str, str]] = [
+            (comp["id"], rtype) for comp in compartments for rtype in resource_types
+        ]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_unit, comp_id, rtype, on_unit, collect) for comp_id, rtype in units]
+            # Os futures são consumidos na ordem de submissão: o merge é determinístico
+            results = [future.result() for future in futures]
+        self.stats.wall_time = time.perf_counter() - start
+
+        merged: Dict[str, List[Dict[str, Any]]] = {comp["id"]: [] for comp in compartments}
+        for (comp_id, _), resources in zip(units, results):
+            merged[comp_id].extend(resources)
+        return merged
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Descoberta de recursos via Resource Search da OCI.
+
+Em vez de listar cada tipo de recurso em cada compartimento (O(compartimentos × tipos)
+chamadas), uma única consulta estruturada sobre a defined tag devolve, em um stream
+paginado, todos os recursos que a carregam em todos os compartimentos da região.
+
+O FakeSearchClient implementa o mesmo contrato de search_resources em memória, para
+testar o modo de busca offline (o backend de fake_oci.py usa o mesmo parser de consulta,
+então o `search_client` entregue pelas factories dele também atende a busca):
+
+    python search_discovery.py --resources 20000 --tagged 150 --page-size 100
+"""
+
+import random
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import click
+import oci
+
+from pagination import PageStats, paginate
+from resource_registry import DEFAULT_RESOURCE_TYPES, REGISTRY
+
+# Tipo retornado pelo Resource Search -> tipo usado pelos scripts
+SEARCH_TYPE_MAP = {rt.search_type: rt.name for rt in REGISTRY.values() if rt.search_type}
+
+
+def query_literal(value: str) -> str:
+    """
+    Literal entre aspas simples da consulta estruturada. A linguagem de consulta não tem
+    escape documentado para aspas dentro do literal, então valores com aspas, barra
+    invertida ou quebra de linha são recusados em vez de gerar uma consulta quebrada.
+    """
+    if any(char in value for char in "'\\\r\n"):
+        raise ValueError(f"Valor não suportado no Resource Search (aspas, barra invertida ou quebra de linha): {value!r}")
+    return f"'{value}'"
+
+
+def build_tag_query(tag_namespace: str, tag_key: str, tag_value: str, search_types: Optional[List[str]] = None) -> str:
+    """Monta a consulta estruturada que filtra recursos pela defined tag (ValueError se algum valor for inválido)."""
+    types = ", ".join(t.lower() for t in (search_types or SEARCH_TYPE_MAP))
+    return (f"query {types} resources where "
+            f"(definedTags.namespace = {query_literal(tag_namespace)} && "
+            f"definedTags.key = {query_literal(tag_key)} && "
+            f"definedTags.value = {query_literal(tag_value)})")
+
+
+class SearchDiscovery:
+    """Backend de descoberta baseado em search_resources, com paginação em streaming."""
+
+    def __init__(self, search_client: Any, page_stats: Optional[PageStats] = None, region: Optional[str] = None):
+        self.search_client = search_client
+        self.page_stats = page_stats
+        self.region = region
+        self.skipped_types: Dict[str, int] = {}
+
+    def find_resources_with_tag(self, tag_namespace: str = "finops", tag_key: str = "customer", tag_value: str = "seduc-go",
+                                resource_types: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Entrega, um a um, os recursos que carregam a tag, no mesmo formato do find_resources_with_tag."""
+        resource_types = resource_types or DEFAULT_RESOURCE_TYPES
+        search_types = [REGISTRY[name].search_type for name in resource_types if REGISTRY[name].search_type]
+        details = oci.resource_search.models.StructuredSearchDetails(
+            type="Structured",
+            matching_context_type="NONE",
+            query=build_tag_query(tag_namespace, tag_key, tag_value, search_types)
+        )
+        for summary in paginate(self.search_client.search_resources, search_details=details,
+                                label="Search", stats=self.page_stats):
+            resource_type = SEARCH_TYPE_MAP.get(summary.resource_type)
+            if resource_type is None or resource_type not in resource_types:
+                # Tipos que os scripts ainda não sabem atualizar ficam de fora, mas são contabilizados
+                self.skipped_types[summary.resource_type] = self.skipped_types.get(summary.resource_type, 0) + 1
+                continue
+            yield {
+                "type": resource_type,
+                "id": summary.identifier,
+                "name": summary.display_name,
+                "lifecycle_state": summary.lifecycle_state,
+                "compartment_id": summary.compartment_id,
+                "region": self.region,
+                "defined_tags": summary.defined_tags or {},
+                "freeform_tags": summary.freeform_tags or {},
+                # O identifier da busca é o OCID, primeiro campo de identidade dos tipos com search_type
+                "identity": {next(iter(REGISTRY[resource_type].identity)): summary.identifier}
+            }
+
+
+class FakeSearchClient:
+    """Substituto local do ResourceSearchClient: aplica a consulta de tag sobre recursos em memória."""
+
+    _QUERY_RE = re.compile(
+        r"query (?P<types>.+?) resources where \("
+        r"definedTags\.namespace = '(?P<namespace>[^']*)' && "
+        r"definedTags\.key = '(?P<key>[^']*)' && "
+        r"definedTags\.value = '(?P<value>[^']*)'\)"
+    )
+
+    def __init__(self, resources: List[Any], page_size: int = 100):
+        self.resources = resources
+        self.page_size = page_size
+        self.calls = 0
+
+    @classmethod
+    def generate(cls, total: int, tagged: int, compartments: int = 50, page_size: int = 100, seed: int = 42) -> "FakeSearchClient":
+        """Gera um inventário sintético em que `tagged` recursos carregam finops.customer=seduc-go."""
+        rnd = random.Random(seed)
+        tagged_indexes = set(rnd.sample(range(total), min(tagged, total)))
+        resources = []
+        for i in range(total):
+            search_type = rnd.choice([REGISTRY[name].search_type for name in DEFAULT_RESOURCE_TYPES])
+            tags = {"finops": {"customer": "seduc-go" if i in tagged_indexes else "outro"}}
+            resources.append(oci.resource_search.models.ResourceSummary(
+                resource_type=search_type,
+                identifier=f"ocid1.{search_type.lower()}.oc1..fake{i:08d}",
+                compartment_id=f"ocid1.compartment.oc1..fake{i % compartments:04d}",
+                display_name=f"{search_type.lower()}-{i}",
+                lifecycle_state="AVAILABLE",
+                defined_tags=tags
+            ))
+        return cls(resources, page_size=page_size)
+
+    @classmethod
+    def parse_query(cls, query: str) -> Tuple[Set[str], str, str, str]:
+        """Tipos (em minúsculas), namespace, chave e valor de uma consulta de build_tag_query."""
+        match = cls._QUERY_RE.match(query)
+        if not match:
+            raise ValueError(f"Consulta não suportada pelo FakeSearchClient: {query}")
+        types = {t.strip() for t in match.group("types").split(",")}
+        return types, match.group("namespace"), match.group("key"), match.group("value")
+
+    @staticmethod
+    def page(matching: List[Any], page: Optional[str], limit: int) -> oci.response.Response:
+        offset = int(page or 0)
+        items = matching[offset:offset + limit]
+        headers = {}
+        if offset + limit < len(matching):
+            headers["opc-next-page"] = str(offset + limit)
+        return oci.response.Response(200, headers, oci.resource_search.models.ResourceSummaryCollection(items=items), None)
+
+    def search_resources(self, search_details: Any, page: Optional[str] = None, **kwargs) -> oci.response.Response:
+        self.calls += 1
+        types, namespace, key, value = self.parse_query(search_details.query)
+        matching = [
+            r for r in self.resources
+            if r.resource_type.lower() in types
+            and (r.defined_tags or {}).get(namespace, {}).get(key) == value
+        ]
+        return self.page(matching, page, kwargs.get("limit") or self.page_size)
+
+
+@click.command()
+@click.option("--resources", default=10000, show_default=True, help="Total de recursos sintéticos.")
+@click.option("--tagged", default=100, show_default=True, help="Quantos recursos carregam a tag.")
+@click.option("--page-size", default=100, show_default=True, help="Itens por página do fake.")
+def main(resources: int, tagged: int, page_size: int):
+    """Executa a descoberta via busca contra o FakeSearchClient (offline)."""
+    client = FakeSearchClient.generate(resources, tagged, page_size=page_size)
+    stats = PageStats()
+    found = list(SearchDiscovery(client, stats).find_resources_with_tag())
+    print(f"Recursos encontrados: {len(found)} de {resources} ({client.calls} chamadas à API)")
+    for line in stats.summary_lines():
+        print(f"  • {line}")
+
+
+if __name__ == "__main__":
+    main()
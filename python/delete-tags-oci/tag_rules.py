@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Regras de tag avaliadas em uma única passada sobre o inventário.
+
+Cada regra é uma expressão curta sobre uma defined tag (namespace.chave) ou uma freeform
+tag (prefixo "freeform:"):
+
+    finops.customer=seduc-go         valor exato
+    finops.customer^=seduc-          prefixo do valor
+    finops.customer~=^seduc-(go|df)$ expressão regular (re.search)
+    finops.customer                  chave presente, com qualquer valor
+    !finops.cost-center              chave ausente
+    freeform:env=prod                mesmas formas, sobre freeform_tags
+
+O TagMatcher compila o conjunto de regras uma vez: as regras são agrupadas por tag, cada
+tag é lida uma única vez por recurso, as regras de valor exato viram um lookup em um
+índice de valores e os demais predicados (regex já compiladas) são avaliados sobre o valor
+lido. O resultado é a lista de regras satisfeitas pelo recurso.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Regra equivalente ao filtro histórico dos scripts
+DEFAULT_RULE = "finops.customer=seduc-go"
+
+FREEFORM_PREFIX = "freeform:"
+
+# O primeiro operador separa a tag do valor (o valor pode conter "=", "^" ou "~")
+_RULE_RE = re.compile(r"^(?P<tag>[^=^~]+?)(?P<operator>\^=|~=|=)(?P<value>.*)$")
+_OPERATORS = {"^=": "prefix", "~=": "regex", "=": "exact"}
+
+_MISSING = object()
+
+
+class TagRule:
+    """Uma regra de tag já validada. `spec` é a forma textual, usada também como nome."""
+
+    def __init__(self, spec: str, kind: str, key: str, namespace: Optional[str] = None,
+                 value: Optional[str] = None, freeform: bool = False):
+        self.spec = spec
+        self.kind = kind
+        self.key = key
+        self.namespace = namespace
+        self.value = value
+        self.freeform = freeform
+
+    @classmethod
+    def parse(cls, spec: str) -> "TagRule":
+        """Converte a forma textual da regra; lança ValueError se ela for inválida."""
+        text = spec.strip()
+        if not text:
+            raise ValueError("regra de tag vazia")
+        negate = text.startswith("!")
+        if negate:
+            text = text[1:]
+        freeform = text.startswith(FREEFORM_PREFIX)
+        if freeform:
+            text = text[len(FREEFORM_PREFIX):]
+
+        kind, value = ("missing" if negate else "present"), None
+        match = _RULE_RE.match(text)
+        if match:
+            if negate:
+                raise ValueError(f"regra inválida: {spec} ('!' só se aplica à chave, sem valor)")
+            text, value = match.group("tag"), match.group("value")
+            kind = _OPERATORS[match.group("operator")]
+        if kind == "regex":
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"regra inválida: {spec} (regex: {e})")
+
+        if freeform:
+            namespace, key = None, text
+        else:
+            namespace, _, key = text.partition(".")
+        if not key or (not freeform and not namespace):
+            raise ValueError(f"regra inválida: {spec} (use namespace.chave ou freeform:chave)")
+        return cls(spec.strip(), kind, key, namespace, value, freeform)
+
+    @property
+    def display(self) -> str:
+        """Forma usada nas mensagens: "namespace.chave: valor" para regras exatas."""
+        if self.kind == "exact" and not self.freeform:
+            return f"{self.namespace}.{self.key}: {self.value}"
+        return self.spec
+
+    def predicate(self) -> Callable[[Any], bool]:
+        """Predicado sobre o valor da tag (_MISSING quando a chave não existe)."""
+        if self.kind == "missing":
+            return lambda found: found is _MISSING
+        if self.kind == "present":
+            return lambda found: found is not _MISSING
+        if self.kind == "exact":
+            expected = self.value
+            return lambda found: found is not _MISSING and str(found) == expected
+        if self.kind == "prefix":
+            prefix = self.value
+            return lambda found: found is not _MISSING and str(found).startswith(prefix)
+        search = re.compile(self.value).search
+        return lambda found: found is not _MISSING and search(str(found)) is not None
+
+
+class TagMatcher:
+    """Conjunto de regras compilado em um único avaliador por recurso."""
+
+    def __init__(self, rules: List[TagRule]):
+        if not rules:
+            raise ValueError("informe ao menos uma regra de tag")
+        self.rules = rules
+        # (freeform, namespace, chave) -> ({valor exato: [regras]}, [(regra, predicado)])
+        # Regras exatas sobre a mesma chave viram um único lookup no índice de valores
+        groups: "OrderedDict[Tuple[bool, Optional[str], str], Tuple[Dict[str, List[str]], List[Tuple[str, Callable[[Any], bool]]]]]" = OrderedDict()
+        for rule in rules:
+            exact_index, predicates = groups.setdefault((rule.freeform, rule.namespace, rule.key), ({}, []))
+            if rule.kind == "exact":
+                exact_index.setdefault(rule.value, []).append(rule.spec)
+            else:
+                predicates.append((rule.spec, rule.predicate()))
+        self._groups = list(groups.items())
+        self._order = {rule.spec: index for index, rule in enumerate(rules)}
+        # Com uma só regra exata de defined tag, o teste mais rápido é uma comparação direta
+        self.single_exact = rules[0] if len(rules) == 1 and rules[0].kind == "exact" and not rules[0].freeform else None
+
+    @classmethod
+    def parse(cls, specs: List[str]) -> "TagMatcher":
+        seen = OrderedDict()
+        for spec in specs:
+            rule = TagRule.parse(spec)
+            seen.setdefault(rule.spec, rule)
+        return cls(list(seen.values()))
+
+    @classmethod
+    def default(cls) -> "TagMatcher":
+        return cls.parse([DEFAULT_RULE])
+
+    @property
+    def signature(self) -> str:
+        """Identifica o conjunto de regras (chave do inventário em cache)."""
+        return "|".join(rule.spec for rule in self.rules)
+
+    @property
+    def label(self) -> str:
+        if len(self.rules) == 1:
+            return self.rules[0].display
+        return f"{len(self.rules)} regras"
+
+    def match(self, defined_tags: Optional[Dict[str, Dict[str, Any]]],
+              freeform_tags: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Nomes das regras satisfeitas pelas tags do recurso, na ordem em que foram declaradas."""
+        defined_tags = defined_tags or {}
+        if self.single_exact is not None:
+            rule = self.single_exact
+            found = defined_tags.get(rule.namespace, {}).get(rule.key, _MISSING)
+            return [rule.spec] if found is not _MISSING and str(found) == rule.value else []
+        freeform_tags = freeform_tags or {}
+        matched = []
+        for (freeform, namespace, key), (exact_index, predicates) in self._groups:
+            if freeform:
+                found = freeform_tags.get(key, _MISSING)
+            else:
+                found = defined_tags.get(namespace, {}).get(key, _MISSING)
+            if exact_index and found is not _MISSING:
+                matched.extend(exact_index.get(str(found), ()))
+            for name, predicate in predicates:
+                if predicate(found):
+                    matched.append(name)
+        if len(matched) > 1:
+            matched.sort(key=self._order.__getitem__)
+        return matched
+
+
+def load_rules_file(path: str) -> List[str]:
+    """Uma regra por linha; linhas vazias e comentários (#) são ignorados."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Confirmação das remoções de tags, sem reescanear a tenancy.
+
+A chamada de update só indica que a OCI aceitou o novo defined_tags; alguns serviços
+(load balancer, OKE) aplicam a alteração de forma assíncrona e a leitura pode demorar a
+refletir a mudança. A verificação relê apenas os recursos atualizados, com um GET por
+recurso na região dele (get_instance, get_bucket, ...), em rodadas:
+
+  - a primeira rodada lê todos os recursos logo após as atualizações;
+  - os que ainda têm a tag voltam para a rodada seguinte, após uma espera que dobra a
+    cada rodada;
+  - depois da última rodada, os que continuam com a tag vão para o relatório de
+    reconciliação.
+
+Cada rodada roda no RemovalExecutor, com a mesma concorrência limitada e o mesmo
+tratamento de 429 das atualizações. Um 404 significa que o recurso deixou de existir
+depois da atualização e conta como confirmado ("gone").
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from removal_executor import DEFAULT_MAX_CONCURRENCY, RemovalExecutor
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_DELAY = 5.0
+DEFAULT_REPORT_PATH = "tag_removal_reconciliation.jsonl"
+
+# Status finais de um recurso verificado
+CONFIRMED = "confirmed"
+GONE = "gone"
+STILL_TAGGED = "still_tagged"
+ERROR = "error"
+
+
+def describe_error(error: Exception) -> str:
+    """Resumo de uma falha de leitura; o str() de ServiceError traz o dump completo da resposta."""
+    if getattr(error, "status", None) is not None:
+        return f"HTTP {error.status} {getattr(error, 'code', '')}: {getattr(error, 'message', '')}".strip()
+    return str(error)
+
+
+class VerificationResult:
+    """Status final de um recurso, quantas leituras foram feitas e o valor da tag na última."""
+
+    def __init__(self, resource: Dict[str, Any]):
+        self.resource = resource
+        self.status = STILL_TAGGED
+        self.attempts = 0
+        self.tag_value: Any = None
+        self.error: Optional[Exception] = None
+
+    def report_row(self) -> Dict[str, Any]:
+        resource = self.resource
+        return {
+            "status": self.status,
+            "attempts": self.attempts,
+            "region": resource.get("region"),
+            "compartment_id": resource.get("compartment_id"),
+            "type": resource["type"],
+            "id": resource["id"],
+            "name": resource["name"],
+            "tag_value": self.tag_value,
+            "error": describe_error(self.error) if self.error else None,
+        }
+
+
+class VerificationStats:
+    """Totais por status, rodadas executadas e 429 recebidos durante a verificação."""
+
+    def __init__(self):
+        self.counts = {CONFIRMED: 0, GONE: 0, STILL_TAGGED: 0, ERROR: 0}
+        self.rounds = 0
+        self.reads = 0
+        self.throttled = 0
+        self.wall_time = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.reads} leituras em {self.rounds} rodada(s) | 429 recebidos: {self.throttled} | "
+                f"tempo: {self.wall_time:.2f}s")
+
+
+class TagVerifier:
+    """Relê as tags dos recursos atualizados até confirmar a remoção ou esgotar as rodadas."""
+
+    def __init__(self, read_tags: Callable[[Dict[str, Any]], Dict[str, Any]], tag_namespace: str, tag_key: str,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, attempts: int = DEFAULT_ATTEMPTS,
+                 delay: float = DEFAULT_DELAY):
+        """
+        read_tags(resource) devolve o defined_tags atual do recurso (um GET direto na API)
+        e lança a exceção da OCI em caso de falha.
+        """
+        self.read_tags = read_tags
+        self.tag_namespace = tag_namespace
+        self.tag_key = tag_key
+        self.max_concurrency = max_concurrency
+        self.attempts = attempts
+        self.delay = delay
+        self.stats = VerificationStats()
+
+    def _round_delay(self, round_number: int) -> float:
+        return self.delay * (2 ** (round_number - 2)) if round_number > 1 else 0.0
+
+    def run(self, resources: List[Dict[str, Any]],
+            on_result: Optional[Callable[[VerificationResult], None]] = None,
+            on_round: Optional[Callable[[int, int, float], None]] = None) -> List[VerificationResult]:
+        """
+        Verifica os recursos e devolve um resultado por recurso, na ordem recebida.
+
+        on_result(result) é chamado quando o status de um recurso fica definido (inclusive
+        still_tagged, ao fim da última rodada); on_round(rodada, recursos, espera) antes de
+        cada rodada.
+        """
+        start = time.perf_counter()
+        results = [VerificationResult(resource) for resource in resources]
+        by_resource = {id(result.resource): result for result in results}
+        pending = list(resources)
+
+        def check(resource: Dict[str, Any]) -> bool:
+            result = by_resource[id(resource)]
+            result.attempts += 1
+            tags = self.read_tags(resource)
+            result.tag_value = tags.get(self.tag_namespace, {}).get(self.tag_key)
+            # False = tag ainda presente ("skipped" no executor), o recurso vai para a próxima rodada
+            return self.tag_key not in tags.get(self.tag_namespace, {})
+
+        for round_number in range(1, self.attempts + 1):
+            if not pending:
+                break
+            wait = self._round_delay(round_number)
+            if on_round is not None:
+                on_round(round_number, len(pending), wait)
+            if wait:
+                time.sleep(wait)
+
+            retry: List[Dict[str, Any]] = []
+            last_round = round_number == self.attempts
+
+            def on_done(resource: Dict[str, Any], outcome: str, error: Optional[Exception]):
+                result = by_resource[id(resource)]
+                if outcome == "succeeded":
+                    result.status = CONFIRMED
+                elif outcome == "failed" and getattr(error, "status", None) == 404:
+                    result.status, result.tag_value = GONE, None
+                elif outcome == "failed":
+                    result.status, result.error = ERROR, error
+                elif not last_round:
+                    retry.append(resource)
+                    return
+                if on_result is not None:
+                    on_result(result)
+
+            executor = RemovalExecutor(check, max_concurrency=self.max_concurrency)
+            executor_stats = executor.run(pending, on_done=on_done)
+            self.stats.rounds += 1
+            self.stats.reads += executor_stats.succeeded + executor_stats.skipped + executor_stats.failed
+            self.stats.throttled += executor_stats.throttled
+            # Mantém a ordem original entre as rodadas
+            retry_ids = {id(resource) for resource in retry}
+            pending = [resource for resource in pending if id(resource) in retry_ids]
+
+        for result in results:
+            self.stats.counts[result.status] += 1
+        self.stats.wall_time = time.perf_counter() - start
+        return results
+
+
+def write_report(path: str, results: List[VerificationResult]) -> int:
+    """
+    Grava o relatório de reconciliação (JSONL) com os recursos não confirmados: os que
+    ainda têm a tag e os que não puderam ser lidos. Retorna o número de linhas gravadas;
+    um arquivo vazio indica que todas as remoções foram confirmadas.
+    """
+    rows = [result.report_row() for result in results if result.status in (STILL_TAGGED, ERROR)]
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+    return len(rows)
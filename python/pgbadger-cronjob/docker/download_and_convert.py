@@ -16,6 +16,20 @@
 #
 # Observação:
 #   Certifique-se de que o bucket contenha arquivos .csv.gz válidos gerados a partir dos logs do PostgreSQL.
+#   Com stream_logs: true (padrão) o log é descomprimido durante o download e enviado direto
+#   ao stdin do pgBadger; nem o .gz nem o CSV são gravados no disco do container.
+#   O objeto mais recente é escolhido pela listagem (data no nome do log ou time_modified), sem
+#   HEAD por objeto. O nome e o ETag do último objeto processado ficam em state_object (no
+#   bucket) ou em state_file (em um volume persistente): a execução seguinte lista apenas as
+#   chaves a partir dele e termina sem baixar nada quando o objeto mais recente não mudou.
+#   Cada execução termina com uma linha "[metrics]" com o tempo de cada etapa.
+#   Com --watch o script não termina: mantém o cliente OCI aberto, lista o bucket a cada
+#   poll_interval segundos e gera o relatório assim que um log novo aparece.
+#   Com a lista "environments" no config vários buckets/DB Systems são processados na mesma
+#   execução, em paralelo (até max_parallel_envs), com um único cliente OCI.
+#   Relatórios maiores que upload_part_size_mb são enviados em multipart pelo UploadManager do
+#   SDK, com as partes em paralelo; um envio interrompido é retomado (resume_upload_file) só com
+#   as partes que faltam. upload_gzip envia o HTML comprimido.
 
 #!/usr/bin/env python3
 import oci
@@ -23,37 +37,177 @@ import gzip
 import shutil
 import subprocess
 import os
+import re
+import json
+import time
+import queue
+import signal
+import argparse
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 CONFIG_PATH = "/app/config.yaml"
+COPY_BUFFER = 1024 * 1024
+LOG_NAME_TIME = re.compile(r"(\d{4}-\d{2}-\d{2}_\d{6})")
 
 def load_config():
     with open(CONFIG_PATH, 'r') as file:
         return yaml.safe_load(file)
 
-def get_latest_object(bucket_name, namespace, object_storage):
-    objects = object_storage.list_objects(namespace, bucket_name).data.objects
+# Ambientes do config: cada item de "environments" herda as chaves do nível de cima (sem a
+# lista, o próprio config é o único ambiente). "{name}" nos caminhos vira o nome do ambiente e,
+# com mais de um ambiente, cada um gera o relatório em output_dir/<nome>
+def environment_configs(cfg):
+    defaults = {key: value for key, value in cfg.items() if key != 'environments'}
+    envs = [{**defaults, **env} for env in cfg.get('environments') or [{}]]
+    for env in envs:
+        env.setdefault('name', env['bucket_name'])
+        for key in ('output_dir', 'state_object', 'state_file', 'report_target_path'):
+            if isinstance(env.get(key), str):
+                env[key] = env[key].replace("{name}", env['name'])
+        if len(envs) > 1 and env['output_dir'] == defaults.get('output_dir'):
+            env['output_dir'] = os.path.join(env['output_dir'], env['name'])
+
+    # Dois ambientes com o mesmo estado ou o mesmo relatório se sobrescreveriam a cada execução
+    for key in ('state_object', 'report_target_path'):
+        targets = [(env['bucket_name'], env[key]) for env in envs if env.get(key)]
+        if len(set(targets)) != len(targets):
+            raise ValueError(f"{key} repetido entre ambientes do mesmo bucket; use {{name}} no caminho")
+    state_files = [env['state_file'] for env in envs if env.get('state_file') and not env.get('state_object')]
+    if len(set(state_files)) != len(state_files):
+        raise ValueError("state_file repetido entre ambientes; use {name} no caminho")
+    return envs
+
+# Cliente único para todos os ambientes, com o pool HTTP remontado para pool_size conexões
+# keep-alive (o padrão do SDK atende poucas threads ao mesmo tempo)
+def build_client(config, pool_size):
+    object_storage = oci.object_storage.ObjectStorageClient(config)
+    session = object_storage.base_client.session
+    adapter = session.adapters["https://"]
+    session.mount("https://", type(adapter)(
+        pool_connections=getattr(adapter, "_pool_connections", 1),
+        pool_maxsize=pool_size,
+        max_retries=adapter.max_retries
+    ))
+    return object_storage
+
+# Data do log pelo nome do arquivo (postgresql-2025-06-18_140000.csv.gz); sem esse padrão
+# vale o time_modified/time_created retornado pela listagem
+def object_time(obj):
+    match = LOG_NAME_TIME.search(obj.name)
+    if match:
+        return datetime.strptime(match.group(1), "%Y-%m-%d_%H%M%S").replace(tzinfo=timezone.utc)
+    return getattr(obj, "time_modified", None) or obj.time_created
+
+# Lista todos os .gz do bucket (todas as páginas), com as datas vindas da própria listagem.
+# prefix restringe a listagem aos logs de um DB System e start às chaves >= start
+def list_gz_objects(bucket_name, namespace, object_storage, start=None, prefix=None):
+    objects = []
+    while True:
+        response = object_storage.list_objects(
+            namespace, bucket_name, prefix=prefix or None, start=start,
+            fields="name,etag,timeCreated,timeModified"
+        )
+        objects.extend(obj for obj in response.data.objects if obj.name.endswith(".gz"))
+        start = response.data.next_start_with
+        if not start:
+            return objects
+
+# Estado da última execução ({"object", "etag"}): no bucket, em state_object, ou em um
+# arquivo local, em state_file (em um volume persistente). {} quando não há estado salvo
+def load_state(cfg, object_storage):
+    if cfg.get('state_object'):
+        try:
+            response = object_storage.get_object(cfg['namespace'], cfg['bucket_name'], cfg['state_object'])
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return {}
+            raise
+        return json.loads(response.data.content)
+    state_file = cfg.get('state_file')
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    with open(state_file, 'r') as file:
+        return json.load(file)
+
+def save_state(cfg, object_storage, latest):
+    state = json.dumps({
+        "object": latest.name,
+        "etag": latest.etag,
+        "saved_at": datetime.now(timezone.utc).isoformat()
+    })
+    if cfg.get('state_object'):
+        object_storage.put_object(cfg['namespace'], cfg['bucket_name'], cfg['state_object'], state,
+                                  content_type="application/json")
+        return
+    state_file = cfg.get('state_file')
+    if not state_file:
+        return
+    os.makedirs(os.path.dirname(state_file) or ".", exist_ok=True)
+    tmp_path = state_file + ".tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(state)
+    os.replace(tmp_path, state_file)
+
+# Linha de métricas da execução: se houve processamento e o tempo de cada etapa
+def print_metrics(processed, latest, timings, reason, **extra):
+    stages = " ".join(f"{stage}={seconds:.3f}s" for stage, seconds in timings.items())
+    extras = "".join(f" {key}={value}" for key, value in extra.items())
+    print(f"[metrics] processed={str(processed).lower()} reason={reason} object={latest.name if latest else '-'} "
+          f"{stages} total={sum(timings.values()):.3f}s{extras}")
+
+# Resumo de uma falha; o str() de ServiceError traz o dump completo da resposta
+def describe_error(error):
+    if getattr(error, "status", None) is not None:
+        return f"HTTP {error.status} {getattr(error, 'code', '')}: {getattr(error, 'message', '')}"
+    return str(error)
+
+# Cronômetro por etapa: cada chamada stage(nome) grava o tempo desde a chamada anterior
+def stage_timer(timings):
+    last = [time.perf_counter()]
+
+    def stage(name):
+        now = time.perf_counter()
+        timings[name] = now - last[0]
+        last[0] = now
+    return stage
+
+# Motivo do processamento do objeto mais recente, ou None quando nada mudou desde o estado salvo
+def change_reason(state, latest):
+    if not state:
+        return "no_state"
+    if state.get("object") != latest.name:
+        return "new_object"
+    if state.get("etag") != latest.etag:
+        return "etag_changed"
+    return None
+
+# Escolhe o .gz mais recente sem um HEAD por objeto, entre as chaves que começam com prefix
+# (log_prefix no config; vazio = bucket inteiro). Com prefixo e uma chave salva na execução
+# anterior, só as chaves a partir dela são listadas: os nomes dos logs crescem com a data
+# dentro do prefixo de um DB System, mas não entre prefixos diferentes, então sem prefixo o
+# bucket é sempre listado inteiro. Se a chave salva não existir mais, ou estiver fora do
+# prefixo, o prefixo inteiro é listado
+def get_latest_object(bucket_name, namespace, object_storage, last_key=None, quiet=False, prefix=""):
+    objects = []
+    if prefix and last_key and last_key.startswith(prefix):
+        objects = list_gz_objects(bucket_name, namespace, object_storage, start=last_key, prefix=prefix)
+        if not any(obj.name == last_key for obj in objects):
+            print(f"[!] Última chave processada não encontrada ({last_key}), listando '{prefix}' inteiro")
+            objects = []
     if not objects:
-        raise Exception("Nenhum objeto encontrado no bucket.")
-
-    enriched_objects = []
-    for obj in objects:
-        if obj.name.endswith(".gz"):
-            metadata = object_storage.head_object(namespace, bucket_name, obj.name)
-            enriched_objects.append({
-                "name": obj.name,
-                "time_created": metadata.headers.get("last-modified")
-            })
-
-    from email.utils import parsedate_to_datetime
-    enriched_objects = [
-        {**obj, "dt": parsedate_to_datetime(obj["time_created"])}
-        for obj in enriched_objects if obj["time_created"]
-    ]
-
-    latest = max(enriched_objects, key=lambda x: x["dt"])
-    print(f"[+] Último objeto: {latest['name']} ({latest['time_created']})")
-    return latest["name"]
+        objects = list_gz_objects(bucket_name, namespace, object_storage, prefix=prefix)
+    if not objects:
+        raise Exception(f"Nenhum objeto encontrado no bucket com o prefixo '{prefix}'." if prefix
+                        else "Nenhum objeto encontrado no bucket.")
+
+    latest = max(objects, key=object_time)
+    if not quiet:
+        print(f"[+] Último objeto: {latest.name} ({object_time(latest).isoformat()}, "
+              f"{len(objects)} objeto(s) listado(s))")
+    return latest
 
 def download_object(bucket_name, namespace, object_name, destination, object_storage):
     os.makedirs(destination, exist_ok=True)
@@ -77,26 +231,145 @@ def extract_gz(gz_path):
 def run_pgbadger(csv_file, output_dir):
     os.makedirs(output_dir, exist_ok=True)
     output_html = os.path.join(output_dir, "report.html")
+    # Um único log em csvlog: o pgBadger não divide esse formato entre processos (-j), então
+    # não há opção de paralelismo a passar
     subprocess.run(["pgbadger", csv_file, "-o", output_html], check=True)
     print(f"[+] Relatório: {output_html}")
     return output_html
 
-def upload_report(report_path, bucket_name, namespace, target_path, object_storage):
-    with open(report_path, 'rb') as f:
-        object_storage.put_object(namespace, bucket_name, target_path, f)
-    print(f"[✓] Upload para o bucket como {target_path}")
+def stream_to_pgbadger(bucket_name, namespace, object_name, output_dir, object_storage):
+    os.makedirs(output_dir, exist_ok=True)
+    output_html = os.path.join(output_dir, "report.html")
+    # Entrada pelo stdin: o formato precisa ser informado, pois não há extensão para detectar
+    cmd = ["pgbadger", "-f", "csv", "-", "-o", output_html]
+    response = object_storage.get_object(namespace, bucket_name, object_name)
 
-def main():
-    print("[*] Iniciando...")
+    sent = 0
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        with gzip.GzipFile(fileobj=response.data.raw) as gz:
+            while True:
+                chunk = gz.read(COPY_BUFFER)
+                if not chunk:
+                    break
+                proc.stdin.write(chunk)
+                sent += len(chunk)
+    except BrokenPipeError:
+        pass  # o pgBadger terminou antes do fim da entrada; o código de saída indica o erro
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
 
-    cfg = load_config()
-    config = oci.config.from_file()
-    object_storage = oci.object_storage.ObjectStorageClient(config)
+    print(f"[+] Streaming: {object_name} -> pgBadger ({sent / 1024 / 1024:.1f} MB descomprimidos, sem arquivos locais)")
+    print(f"[+] Relatório: {output_html}")
+    return output_html
+
+# Comprime o relatório para o upload com Content-Encoding: gzip (o navegador descomprime)
+def gzip_report(report_path):
+    gz_path = report_path + ".gz"
+    with open(report_path, 'rb') as f_in:
+        with gzip.open(gz_path, 'wb', compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, COPY_BUFFER)
+    return gz_path
 
-    latest = get_latest_object(cfg['bucket_name'], cfg['namespace'], object_storage)
-    gz_path = download_object(cfg['bucket_name'], cfg['namespace'], latest, cfg['output_dir'], object_storage)
-    csv_path = extract_gz(gz_path)
-    html_path = run_pgbadger(csv_path, cfg['output_dir'])
+# Upload multipart em andamento do objeto (o mais recente iniciado desde started)
+# O UploadManager não devolve o upload_id quando o upload_file falha, então ele é buscado na
+# lista de multiparts pendentes do bucket para retomar ou abortar o envio
+def pending_upload_id(object_storage, namespace, bucket_name, target_path, started):
+    found = None
+    page = None
+    while True:
+        response = object_storage.list_multipart_uploads(namespace, bucket_name, page=page)
+        for upload in response.data:
+            if upload.object == target_path and upload.time_created >= started:
+                if found is None or upload.time_created > found.time_created:
+                    found = upload
+        page = response.next_page
+        if not page:
+            return found.upload_id if found else None
+
+# Envia o arquivo com o UploadManager do SDK (multipart com partes em paralelo acima de
+# part_size, e cada parte com falha reenviada pelo próprio SDK). Se o envio ainda assim falhar,
+# resume_upload_file reenvia só as partes que faltam (até attempts tentativas no total); sem
+# sucesso, o multipart é abortado para não deixar partes órfãs no bucket e o erro do upload
+# é propagado
+def upload_file(object_storage, namespace, bucket_name, target_path, path, part_size, headers, workers, attempts):
+    manager = oci.object_storage.UploadManager(object_storage, allow_parallel_uploads=True,
+                                               parallel_process_count=workers)
+    # Margem para diferença de relógio entre o container e o Object Storage
+    started = datetime.now(timezone.utc) - timedelta(seconds=60)
+    try:
+        manager.upload_file(namespace, bucket_name, target_path, path, part_size=part_size, **headers)
+        return
+    except Exception as e:
+        error = e
+    if os.path.getsize(path) <= part_size:
+        raise error  # envio em uma parte: não há multipart para retomar
+    upload_id = pending_upload_id(object_storage, namespace, bucket_name, target_path, started)
+    if upload_id is None:
+        raise error
+
+    for attempt in range(2, attempts + 1):
+        print(f"[!] Upload de {target_path}: {describe_error(error)}; retomando as partes pendentes "
+              f"(tentativa {attempt} de {attempts})")
+        time.sleep(2 ** (attempt - 1))
+        try:
+            manager.resume_upload_file(namespace, bucket_name, target_path, path, upload_id, part_size=part_size)
+            return
+        except Exception as e:
+            error = e
+
+    try:
+        object_storage.abort_multipart_upload(namespace, bucket_name, target_path, upload_id)
+    except Exception as e:
+        print(f"[!] Falha ao abortar o multipart {upload_id} de {target_path}: {describe_error(e)}")
+    raise error
+
+# Envia o relatório. Acima de upload_part_size_mb o envio é multipart, com até upload_workers
+# partes em paralelo; um envio interrompido é retomado a partir das partes que faltam (até
+# upload_attempts tentativas) em vez de recomeçar o arquivo inteiro. Com upload_gzip o HTML
+# vai comprimido, com Content-Encoding: gzip
+def upload_report(report_path, bucket_name, namespace, target_path, object_storage, cfg=None):
+    cfg = cfg or {}
+    part_size = int(float(cfg.get('upload_part_size_mb', 8)) * 1024 * 1024)
+    workers = cfg.get('upload_workers', 4)
+    attempts = cfg.get('upload_attempts', 3)
+    headers = {"content_type": "text/html"}
+    path = report_path
+    if cfg.get('upload_gzip'):
+        path = gzip_report(report_path)
+        headers["content_encoding"] = "gzip"
+
+    try:
+        start_timer = time.perf_counter()
+        size = os.path.getsize(path)
+        parts = max(1, -(-size // part_size))
+        upload_file(object_storage, namespace, bucket_name, target_path, path, part_size, headers, workers, attempts)
+        duration = max(time.perf_counter() - start_timer, 1e-6)
+    finally:
+        if path != report_path:
+            os.remove(path)  # o .gz temporário
+
+    compressed = f", gzip {size / os.path.getsize(report_path):.0%} do original" if path != report_path else ""
+    print(f"[✓] Upload para o bucket como {target_path}: {size / 1024 / 1024:.1f} MB em {parts} parte(s), "
+          f"{duration:.2f}s ({size / 1024 / 1024 / duration:.1f} MB/s{compressed})")
+
+# Gera o relatório do objeto, publica no bucket e grava o novo estado
+def process_object(cfg, object_storage, latest, stage):
+    if cfg.get('stream_logs', True):
+        html_path = stream_to_pgbadger(cfg['bucket_name'], cfg['namespace'], latest.name, cfg['output_dir'], object_storage)
+        stage("pgbadger")
+    else:
+        gz_path = download_object(cfg['bucket_name'], cfg['namespace'], latest.name, cfg['output_dir'], object_storage)
+        stage("download")
+        csv_path = extract_gz(gz_path)
+        stage("extract")
+        html_path = run_pgbadger(csv_path, cfg['output_dir'])
+        stage("pgbadger")
 
     if cfg.get('upload_report'):
         upload_report(
@@ -104,10 +377,165 @@ def main():
             cfg['bucket_name'],
             cfg['namespace'],
             cfg.get('report_target_path', "relatorio/report.html"),
-            object_storage
+            object_storage,
+            cfg
         )
+        stage("upload")
+
+    save_state(cfg, object_storage, latest)
+    stage("state_save")
+    return html_path
+
+# Execução única (CronJob): processa o objeto mais recente se ele mudou desde a última execução
+# Retorna o motivo do processamento ou "unchanged"
+def run_once(cfg, object_storage, timings, stage):
+    state = load_state(cfg, object_storage)
+    stage("state")
+    latest = get_latest_object(cfg['bucket_name'], cfg['namespace'], object_storage, state.get("object"),
+                               prefix=cfg.get('log_prefix', ""))
+    stage("list")
+
+    # Mesmo objeto e mesmo ETag da última execução: o relatório publicado já está atualizado
+    reason = change_reason(state, latest)
+    if reason is None:
+        print(f"[✓] {cfg['name']}: nenhum log novo desde a última execução ({latest.name}), nada a fazer.")
+        print_metrics(False, latest, timings, "unchanged", env=cfg['name'])
+        return "unchanged"
+
+    process_object(cfg, object_storage, latest, stage)
+    print(f"[✓] {cfg['name']}: finalizado com sucesso.")
+    print_metrics(True, latest, timings, reason, env=cfg['name'])
+    return reason
+
+# Execução única de um ambiente em lote; a falha de um ambiente não interrompe os outros
+def run_environment(cfg, object_storage):
+    timings = {}
+    start_timer = time.perf_counter()
+    try:
+        result, error = run_once(cfg, object_storage, timings, stage_timer(timings)), None
+    except Exception as e:
+        print(f"[!] {cfg['name']}: falha: {describe_error(e)}")
+        result, error = "error", e
+    return cfg, result, time.perf_counter() - start_timer, error
+
+# Modo watcher: o mesmo cliente fica aberto e o bucket é listado a cada poll_interval segundos.
+# A listagem e o processamento rodam em threads separadas, ligadas por uma fila limitada: se
+# chegar um objeto novo enquanto outro é processado, só o mais recente fica pendente. O último
+# objeto visto (seen) é compartilhado pelas duas threads e só é lido/alterado com seen_lock
+def watch(cfg, object_storage, poll_interval, stop=None):
+    stop = stop or threading.Event()
+    pending = queue.Queue(maxsize=cfg.get('watch_queue_size', 1))
+    state = load_state(cfg, object_storage)
+    seen = {"object": state.get("object"), "etag": state.get("etag")}
+    seen_lock = threading.Lock()
+    print(f"[*] {cfg['name']}: modo watcher, listagem a cada {poll_interval:g}s "
+          f"(último processado: {seen['object'] or '-'})")
+
+    def worker():
+        while not (stop.is_set() and pending.empty()):
+            try:
+                latest, reason, detected_at = pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            timings = {"queue": time.perf_counter() - detected_at}
+            try:
+                process_object(cfg, object_storage, latest, stage_timer(timings))
+            except Exception as e:
+                print(f"[!] {cfg['name']}: falha ao processar {latest.name}: {describe_error(e)}")
+                with seen_lock:
+                    # O objeto volta para a fila na próxima listagem, a menos que a listagem já
+                    # tenha visto um mais recente (que está na fila e o substitui)
+                    if seen["object"] == latest.name and seen["etag"] == latest.etag:
+                        seen.update(object=None, etag=None)
+                continue
+            arrived = getattr(latest, "time_modified", None) or getattr(latest, "time_created", None)
+            lag = f"{(datetime.now(timezone.utc) - arrived).total_seconds():.1f}s" if arrived else "-"
+            print_metrics(True, latest, timings, reason, env=cfg['name'], lag=lag)
+
+    consumer = threading.Thread(target=worker, name=f"pgbadger-worker-{cfg['name']}", daemon=True)
+    consumer.start()
+    while not stop.is_set():
+        with seen_lock:
+            last_key = seen["object"]
+        try:
+            latest = get_latest_object(cfg['bucket_name'], cfg['namespace'], object_storage,
+                                       last_key, quiet=True, prefix=cfg.get('log_prefix', ""))
+        except Exception as e:
+            print(f"[!] {cfg['name']}: falha na listagem: {describe_error(e)}")
+            latest = None
+        reason = None
+        if latest:
+            with seen_lock:
+                reason = change_reason(seen, latest)
+                if reason:
+                    seen.update(object=latest.name, etag=latest.etag)
+        if reason:
+            print(f"[+] {cfg['name']}: novo objeto {latest.name} ({reason})")
+            item = (latest, reason, time.perf_counter())
+            while True:
+                try:
+                    pending.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        skipped = pending.get_nowait()[0]
+                        print(f"[*] {skipped.name} substituído na fila por um objeto mais recente")
+                    except queue.Empty:
+                        pass
+
+        stop.wait(poll_interval)
+    consumer.join()
+    print(f"[✓] {cfg['name']}: watcher finalizado.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o relatório do pgBadger a partir do log mais recente do bucket")
+    parser.add_argument("--watch", action="store_true",
+                        help="fica em execução e processa cada log novo (em vez de uma execução por CronJob)")
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="intervalo entre as listagens no modo --watch, em segundos (padrão: poll_interval do config ou 10)")
+    args = parser.parse_args()
+
+    print("[*] Iniciando...")
+    timings = {}
+    stage = stage_timer(timings)
+
+    cfg = load_config()
+    envs = environment_configs(cfg)
+    parallel = max(1, min(cfg.get('max_parallel_envs') or len(envs), len(envs)))
+    config = oci.config.from_file()
+    object_storage = build_client(config, max(parallel * cfg.get('upload_workers', 4), 10))
+    stage("setup")
+
+    if args.watch:
+        # SIGTERM (fim do pod) e Ctrl+C terminam os relatórios em andamento antes de sair
+        stop = threading.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stop.set())
+        poll_interval = args.poll_interval or cfg.get('poll_interval', 10)
+        watchers = [threading.Thread(target=watch, args=(env, object_storage, poll_interval), kwargs={"stop": stop})
+                    for env in envs]
+        for watcher in watchers:
+            watcher.start()
+        # join com timeout mantém a thread principal livre para tratar os sinais
+        while any(watcher.is_alive() for watcher in watchers):
+            for watcher in watchers:
+                watcher.join(timeout=1)
+        return
+
+    if len(envs) == 1:
+        run_once(envs[0], object_storage, timings, stage)
+        return
+
+    print(f"[*] {len(envs)} ambiente(s), {parallel} processado(s) ao mesmo tempo")
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = list(executor.map(lambda env: run_environment(env, object_storage), envs))
 
-    print("[✓] Finalizado com sucesso.")
+    print(f"[*] Resumo por ambiente (setup: {timings['setup']:.2f}s):")
+    for env, result, duration, error in results:
+        print(f"  - {env['name']}: {result}, {duration:.2f}s" + (f" ({describe_error(error)})" if error else ""))
+    failed = [env['name'] for env, _, _, error in results if error]
+    if failed:
+        raise SystemExit(f"[!] Falha em {len(failed)} ambiente(s): {', '.join(failed)}")
 
 if __name__ == "__main__":
     main()
@@ -7,7 +7,9 @@ import shutil                  # Para manipulação de arquivos
 import subprocess              # Para execução do comando pgbadger
 import os                      # Para manipulação de variáveis de ambiente e arquivos
 import time                    # Para cálculo de tempo de execução
-from datetime import datetime, timezone  # Manipulação de datas em UTC
+import threading               # Criação do cliente compartilhado entre as threads
+from concurrent.futures import ThreadPoolExecutor  # Pool de downloads
+from datetime import datetime, timedelta, timezone  # Manipulação de datas em UTC
 import re                      # Expressões regulares
 
 # Dicionário com a configuração de cada ambiente mapeado por chave
@@ -23,6 +25,97 @@ ENVIRONMENTS = {
     # Insira mais ambiente aqui ....
 }
 
+# Downloads paralelos: número de GETs simultâneos (PG_DOWNLOAD_WORKERS) e tamanho de cada
+# parte (PG_PART_SIZE_MB). Objetos maiores que uma parte são baixados em ranges paralelos.
+DOWNLOAD_WORKERS = int(os.environ.get("PG_DOWNLOAD_WORKERS", "8"))
+PART_SIZE = int(float(os.environ.get("PG_PART_SIZE_MB", "16")) * 1024 * 1024)
+COPY_BUFFER = 1024 * 1024
+
+# Conexões HTTP keep-alive mantidas pelo cliente compartilhado (PG_POOL_SIZE).
+# Deve ser >= downloads simultâneos de todos os ambientes em processamento: acima do tamanho
+# do pool, cada GET abre uma conexão nova. Sem PG_POOL_SIZE o tamanho é calculado no main
+POOL_SIZE = int(os.environ.get("PG_POOL_SIZE", "0"))
+
+# Vários ambientes por execução (PG_ENV=0,2,3 ou PG_ENV=all): quantos são processados ao
+# mesmo tempo (PG_ENV_WORKERS, padrão: todos). Cada ambiente pode limitar os próprios
+# downloads e jobs do pgbadger com as chaves "download_workers" e "jobs" em ENVIRONMENTS
+ENV_WORKERS = int(os.environ.get("PG_ENV_WORKERS", "0"))
+
+# Diretório dos relatórios; os logs de cada ambiente ficam em um subdiretório com o nome dele
+OUTPUT_DIR = "/tmp/pgbadger-output"
+
+# Como os logs chegam ao pgbadger (PG_LOG_MODE):
+#   gz      - baixa os .csv.gz em paralelo e o pgbadger lê os arquivos comprimidos (padrão)
+#   stream  - nada é gravado em disco: cada objeto é descomprimido durante o download e
+#             enviado direto ao stdin do pgbadger, em ordem cronológica
+#   extract - baixa e descompacta cada arquivo antes de rodar o pgbadger (modo antigo)
+LOG_MODES = ("gz", "stream", "extract")
+LOG_MODE = os.environ.get("PG_LOG_MODE", "gz")
+
+PGBADGER_PREFIX = "%t [%p]: [%l-1] user=%u,db=%d,app=%a,client=%h"
+
+# Processos/jobs paralelos do pgbadger (PG_JOBS, padrão: número de CPUs): -J para vários
+# arquivos, -j para um único arquivo descomprimido e, no modo incremental, quantos logs
+# novos são convertidos em binário ao mesmo tempo
+JOBS = int(os.environ.get("PG_JOBS", str(os.cpu_count() or 1)))
+
+# Modo incremental (PG_INCREMENTAL=1): cada log é convertido uma única vez no formato
+# binário do pgbadger e guardado em PG_BINARY_DIR (e, com PG_BINARY_PREFIX, também no
+# bucket do ambiente). O relatório é montado a partir dos binários, e apenas os logs que
+# ainda não têm binário (ou cujo ETag mudou) são lidos novamente
+INCREMENTAL = os.environ.get("PG_INCREMENTAL", "0").lower() not in ("", "0", "false")
+BINARY_DIR = os.environ.get("PG_BINARY_DIR", "/tmp/pgbadger-binary")
+BINARY_PREFIX = os.environ.get("PG_BINARY_PREFIX", "")
+
+# PG_DEBUG=1 habilita as mensagens [DEBUG] (páginas listadas, conexões abertas...)
+DEBUG = os.environ.get("PG_DEBUG", "0").lower() not in ("", "0", "false")
+
+def debug(message):
+    if DEBUG:
+        print(f"[DEBUG] {message}")
+
+# Carrega a configuração OCI a partir de variáveis de ambiente
+def load_config():
+    # return oci.config.from_file() # Para uso local
+    return {
+        "user": os.environ["OCI_CLI_USER"],
+        "tenancy": os.environ["OCI_CLI_TENANCY"],
+        "fingerprint": os.environ["OCI_CLI_FINGERPRINT"],
+        "key_content": os.environ["OCI_CLI_KEY_CONTENT"],
+        "region": os.environ["OCI_CLI_REGION"]
+    }
+
+_client = None
+_client_lock = threading.Lock()
+
+# Cliente Object Storage único do processo, usado pela listagem e por todos os downloads
+# Como no UploadManager do SDK, as threads compartilham o cliente e o adapter HTTPS é
+# remontado com pool_maxsize=POOL_SIZE, de forma que cada thread reaproveita uma conexão
+# keep-alive em vez de refazer o handshake TLS a cada objeto. pool_size só vale na criação
+def get_client(pool_size=None):
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = oci.object_storage.ObjectStorageClient(load_config())
+            session = client.base_client.session
+            adapter = session.adapters["https://"]
+            session.mount("https://", type(adapter)(
+                pool_connections=getattr(adapter, "_pool_connections", 1),
+                pool_maxsize=pool_size or POOL_SIZE or DOWNLOAD_WORKERS,
+                max_retries=adapter.max_retries
+            ))
+            _client = client
+    return _client
+
+# Conexões abertas, requisições feitas e tamanho do pool do cliente compartilhado (contadores do urllib3)
+def connection_stats():
+    if _client is None:
+        return 0, 0, 0
+    adapter = _client.base_client.session.adapters["https://"]
+    pools = [adapter.poolmanager.pools[key] for key in list(adapter.poolmanager.pools.keys())]
+    return (sum(pool.num_connections for pool in pools), sum(pool.num_requests for pool in pools),
+            getattr(adapter, "_pool_maxsize", 0))
+
 # Converte string "YYYY-MM-DD HH:MM" para datetime UTC
 def parse_datetime(dt_str):
     return datetime.strptime(dt_str, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
@@ -35,74 +128,165 @@ def extract_datetime_from_filename(filename):
         return datetime.strptime(match.group(1), "%Y-%m-%d_%H%M%S").replace(tzinfo=timezone.utc)
     return None
 
-# Lista os objetos dentro do bucket no intervalo especificado
-# Compara com base na data extraída do nome do arquivo
-def get_objects_by_range(bucket_name, namespace, prefix, start_time, end_time):
-    # Carrega a configuração OCI a partir de variáveis de ambiente
-    # config = oci.config.from_file() # Para uso local
-    config = {
-        "user": os.environ["OCI_CLI_USER"],
-        "tenancy": os.environ["OCI_CLI_TENANCY"],
-        "fingerprint": os.environ["OCI_CLI_FINGERPRINT"],
-        "key_content": os.environ["OCI_CLI_KEY_CONTENT"],
-        "region": os.environ["OCI_CLI_REGION"]
-    }
-    client = oci.object_storage.ObjectStorageClient(config)
+# Nome (chave) do log que começa no instante informado, no mesmo formato dos arquivos
+# A ordem lexicográfica das chaves é a ordem cronológica dos logs
+def log_key(prefix, moment):
+    return f"{prefix}postgresql-{moment.strftime('%Y-%m-%d_%H%M%S')}"
+
+# Prefixos mínimos que cobrem a janela: um por dia (ex.: .../postgresql-2025-06-18_)
+def day_prefixes(prefix, start_time, end_time):
+    prefixes = []
+    day = start_time.date()
+    while day <= end_time.date():
+        prefixes.append(f"{prefix}postgresql-{day.strftime('%Y-%m-%d')}_")
+        day += timedelta(days=1)
+    return prefixes
 
-    filtered = []       # Lista dos arquivos válidos encontrados
+# Lista (com paginação) os objetos sob um prefixo, opcionalmente entre as chaves start e end
+# (start inclusiva, end exclusiva, como na API do Object Storage)
+def list_objects(bucket_name, namespace, prefix, start=None, end=None):
+    client = get_client()
+    listed = []
     next_token = None   # Token para paginação
     page = 1            # Contador de páginas para debug
-    start_timer = time.time()  # Cronômetro para medir performance
-
     while True:
         # Paginação da API de listagem de objetos
         response = client.list_objects(
             namespace,
             bucket_name,
             prefix=prefix,
-            start=next_token,
-            fields="name"
+            start=next_token or start,
+            end=end,
+            fields="name,size,etag"
         )
         objects = response.data.objects
-
-        # print(f"[*] Página {page}: {len(objects)} objeto(s) retornado(s).")  # [DEBUG] Comentado para produção
-        # for obj in objects:
-        #     print(f"  - {obj.name}")  # [DEBUG] loop que imprime o nome de cada arquivo listado. Comentado para produção.
+        debug(f"{prefix} - página {page}: {len(objects)} objeto(s) retornado(s).")
         page += 1
-
-        for obj in objects:
-            if not obj.name.endswith(".gz"):
-                continue  # Ignora arquivos que não sejam gzipados
-            log_time = extract_datetime_from_filename(obj.name)
-            if log_time and start_time <= log_time <= end_time:
-                filtered.append(obj.name)
-
+        listed.extend(objects)
         if not response.data.next_start_with:
             break  # Fim da paginação
         next_token = response.data.next_start_with
+    return listed
+
+# Mantém os .gz cuja data (extraída do nome do arquivo) está no intervalo
+def filter_by_range(objects, start_time, end_time):
+    filtered = []
+    for obj in objects:
+        if not obj.name.endswith(".gz"):
+            continue  # Ignora arquivos que não sejam gzipados
+        log_time = extract_datetime_from_filename(obj.name)
+        if log_time and start_time <= log_time <= end_time:
+            filtered.append(obj)
+    return filtered
+
+# Primeiro objeto sob o prefixo a partir da chave start, ou None (uma chamada com limit=1)
+def first_object(bucket_name, namespace, prefix, start=None):
+    response = get_client().list_objects(namespace, bucket_name, prefix=prefix, start=start, limit=1, fields="name")
+    objects = response.data.objects
+    return objects[0] if objects else None
+
+# Verifica com até duas chamadas (limit=1) se os logs do prefixo seguem o padrão
+# prefixo/postgresql-AAAA-MM-DD_...: o primeiro objeto a partir de "prefixo/postgresql-"
+# precisa existir e ter esse formato. Prefixo vazio também conta como padrão conhecido
+def layout_is_known(bucket_name, namespace, prefix):
+    first = first_object(bucket_name, namespace, prefix, start=f"{prefix}postgresql-")
+    if first is None:
+        # Nada a partir da chave dos logs: o prefixo está vazio ou usa outro padrão de nomes
+        return first_object(bucket_name, namespace, prefix) is None
+    return re.match(re.escape(prefix) + r"postgresql-\d{4}-\d{2}-\d{2}_", first.name) is not None
+
+# Lista os objetos dentro do bucket no intervalo especificado
+# Em vez de listar tudo sob o prefixo do DB System, lista em paralelo só os prefixos dos
+# dias da janela, limitados pelas chaves do início e do fim do intervalo (start/end da
+# API). Se nada for encontrado assim, uma sondagem com limit=1 decide se a janela está
+# de fato vazia ou se os logs estão fora do padrão prefixo/postgresql-AAAA-MM-DD_...;
+# só no segundo caso o prefixo inteiro é listado como antes
+# Retorna os ObjectSummary (nome e tamanho), usados para planejar os downloads em partes
+def get_objects_by_range(bucket_name, namespace, prefix, start_time, end_time):
+    start_timer = time.time()  # Cronômetro para medir performance
+    start_key = log_key(prefix, start_time)
+    # "~" vem depois de "." na ordem das chaves: inclui o log que começa exatamente no fim
+    end_key = log_key(prefix, end_time) + "~"
+    prefixes = day_prefixes(prefix, start_time, end_time)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(prefixes), DOWNLOAD_WORKERS))) as executor:
+        pages = executor.map(lambda p: list_objects(bucket_name, namespace, p, start_key, end_key), prefixes)
+        listed = [obj for objects in pages for obj in objects]
+    scanned = f"{len(prefixes)} prefixo(s) por data"
 
+    if not listed and not layout_is_known(bucket_name, namespace, prefix):
+        print("[!] Logs fora do padrão postgresql-AAAA-MM-DD_; listando o prefixo completo do DB System.")
+        listed = list_objects(bucket_name, namespace, prefix)
+        scanned = "prefixo completo"
+
+    filtered = filter_by_range(listed, start_time, end_time)
     duration = time.time() - start_timer
-    # print(f"[*] Busca concluída em {duration:.2f} segundos. Total de objetos filtrados: {len(filtered)}")  # [DEBUG] Comentado para produção
+    print(f"[*] Listagem: {len(listed)} objeto(s) listado(s) em {scanned}, {len(filtered)} mantido(s) "
+          f"({duration:.2f}s)")
     return filtered
 
-# Faz o download do objeto especificado do bucket para um diretório local
+# Faz o download do objeto especificado do bucket para um diretório local (sem partes)
 def download_object(bucket, namespace, name, dest):
-    # config = oci.config.from_file() # Para uso local
-    config = {
-        "user": os.environ["OCI_CLI_USER"],
-        "tenancy": os.environ["OCI_CLI_TENANCY"],
-        "fingerprint": os.environ["OCI_CLI_FINGERPRINT"],
-        "key_content": os.environ["OCI_CLI_KEY_CONTENT"],
-        "region": os.environ["OCI_CLI_REGION"]
-    }
-    client = oci.object_storage.ObjectStorageClient(config)
-    r = client.get_object(namespace, bucket, name)
+    r = get_client().get_object(namespace, bucket, name)
     os.makedirs(dest, exist_ok=True)
     local_path = os.path.join(dest, os.path.basename(name))
     with open(local_path, "wb") as f:
         shutil.copyfileobj(r.data.raw, f)
     return local_path
 
+# Divide um objeto em partes (offset, fim inclusivo) de até part_size bytes
+# Objetos menores que uma parte (ou sem tamanho conhecido) viram um único GET sem range
+def plan_parts(size, part_size):
+    if not size or size <= part_size:
+        return [(0, None)]
+    return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+# Baixa uma parte do objeto e grava no offset correspondente do arquivo local
+def download_part(bucket, namespace, name, local_path, start, end):
+    kwargs = {"range": f"bytes={start}-{end}"} if end is not None else {}
+    r = get_client().get_object(namespace, bucket, name, **kwargs)
+    written = 0
+    with open(local_path, "r+b") as f:
+        f.seek(start)
+        while True:
+            chunk = r.data.raw.read(COPY_BUFFER)
+            if not chunk:
+                break
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+# Baixa todos os objetos em paralelo para o diretório local
+# Cada objeto é pré-alocado com o tamanho final e todas as partes de todos os objetos
+# dividem o mesmo pool, de forma que um arquivo grande não segura os demais
+# Retorna os caminhos locais na mesma ordem dos objetos
+def download_objects(bucket, namespace, objects, dest, workers=DOWNLOAD_WORKERS, part_size=PART_SIZE):
+    os.makedirs(dest, exist_ok=True)
+    local_paths = []
+    tasks = []
+    for obj in objects:
+        local_path = os.path.join(dest, os.path.basename(obj.name))
+        with open(local_path, "wb") as f:
+            if obj.size:
+                f.truncate(obj.size)
+        local_paths.append(local_path)
+        for start, end in plan_parts(obj.size, part_size):
+            tasks.append((obj.name, local_path, start, end))
+
+    start_timer = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(download_part, bucket, namespace, name, path, start, end)
+                   for name, path, start, end in tasks]
+        total_bytes = sum(future.result() for future in futures)
+    duration = max(time.time() - start_timer, 1e-6)
+
+    print(f"[*] Download: {len(objects)} objeto(s), {len(tasks)} parte(s), {total_bytes / 1024 / 1024:.1f} MB "
+          f"em {duration:.2f}s ({total_bytes / 1024 / 1024 / duration:.1f} MB/s, "
+          f"{len(objects) / duration:.1f} objetos/s, {workers} downloads simultâneos)")
+    connections, requests_made, pool_size = connection_stats()
+    debug(f"Conexões HTTP abertas: {connections} para {requests_made} requisição(ões) (pool: {pool_size})")
+    return local_paths
+
 # Descompacta o arquivo .gz e retorna o caminho do arquivo extraído
 def extract_gz(gz_path):
     out_path = gz_path.rstrip(".gz")
@@ -111,6 +295,201 @@ def extract_gz(gz_path):
             shutil.copyfileobj(f_in, f_out)
     return out_path
 
+# Envia os objetos, em ordem, descomprimidos para o stdin do pgbadger (modo stream)
+# Nada passa pelo disco: o corpo da resposta é descomprimido em blocos de COPY_BUFFER
+# enquanto o pgbadger processa o bloco anterior
+def stream_objects(bucket, namespace, objects, sink, quiet=False):
+    start_timer = time.time()
+    compressed = 0
+    uncompressed = 0
+    for obj in objects:
+        r = get_client().get_object(namespace, bucket, obj.name)
+        with gzip.GzipFile(fileobj=r.data.raw) as gz:
+            while True:
+                chunk = gz.read(COPY_BUFFER)
+                if not chunk:
+                    break
+                sink.write(chunk)
+                uncompressed += len(chunk)
+        compressed += obj.size or 0
+        debug(f"Enviado ao pgbadger: {obj.name}")
+    duration = max(time.time() - start_timer, 1e-6)
+    (debug if quiet else print)(
+        f"[*] Streaming: {len(objects)} objeto(s), {compressed / 1024 / 1024:.1f} MB comprimidos -> "
+        f"{uncompressed / 1024 / 1024:.1f} MB enviados ao pgbadger em {duration:.2f}s "
+        f"({uncompressed / 1024 / 1024 / duration:.1f} MB/s)")
+
+# Opções de paralelismo do pgbadger para as entradas: -J processa vários arquivos ao mesmo
+# tempo, com no máximo um processo por arquivo. -j (dividir um arquivo) não é usado: o
+# pgbadger o ignora para csvlog, então um único log ou o stdin são lidos em um processo
+def parallel_options(inputs, jobs=JOBS):
+    if jobs <= 1 or len(inputs) <= 1:
+        return []
+    return ["-J", str(min(jobs, len(inputs)))]
+
+# Monta o comando do pgbadger; inputs são arquivos (.csv, .csv.gz ou binários .bin) ou "-"
+# para o stdin. output .html gera o relatório e .bin o formato binário do pgbadger
+def pgbadger_command(inputs, output, jobs=JOBS):
+    cmd = ["pgbadger"]
+    if not all(path.endswith(".bin") for path in inputs):
+        cmd += ["--prefix", PGBADGER_PREFIX]
+    if inputs == ["-"]:
+        cmd += ["-f", "csv"]  # o formato não pode ser detectado pelo nome quando a entrada é o stdin
+    return cmd + parallel_options(inputs, jobs) + [*inputs, "-o", output]
+
+# Exibe o comando completo (um argumento por linha, como seria digitado no terminal)
+def print_command(cmd):
+    print("[*] Comando completo:")
+    lines = [cmd[0]]
+    i = 1
+    while i < len(cmd):
+        if cmd[i].startswith("-") and cmd[i] != "-" and i + 1 < len(cmd) and not cmd[i + 1].startswith("-"):
+            value = f"\"{cmd[i + 1]}\"" if " " in cmd[i + 1] else cmd[i + 1]
+            lines.append(f"{cmd[i]} {value}")
+            i += 2
+        else:
+            lines.append(cmd[i])
+            i += 1
+    print(" \\\n  ".join(lines))
+
+# Roda o pgbadger recebendo os logs pelo stdin, alimentado por stream_objects
+# quiet=True (conversões do modo incremental) omite o comando, a saída e o resumo do streaming
+def run_pgbadger_streaming(bucket, namespace, objects, output, quiet=False):
+    cmd = pgbadger_command(["-"], output)
+    if not quiet:
+        print_command(cmd)
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL if quiet else None)
+    try:
+        stream_objects(bucket, namespace, objects, proc.stdin, quiet)
+    except BrokenPipeError:
+        pass  # o pgbadger terminou antes do fim da entrada; o código de saída abaixo indica o erro
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+# Nome do binário de um log: o nome do arquivo e o ETag do objeto, de forma que um log
+# regravado no bucket gera um binário novo
+def binary_name(obj):
+    etag = re.sub(r"[^A-Za-z0-9-]", "", getattr(obj, "etag", None) or "")
+    base = os.path.basename(obj.name)
+    return f"{base}.{etag}.bin" if etag else f"{base}.bin"
+
+# Prefixos dos binários no bucket que cobrem os logs: um por dia, como em day_prefixes
+# (os binários têm o nome do log, então postgresql-AAAA-MM-DD_ também os agrupa por dia)
+def binary_prefixes(remote_prefix, objects):
+    days = sorted({extract_datetime_from_filename(obj.name).date() for obj in objects})
+    return [f"{remote_prefix}postgresql-{day.strftime('%Y-%m-%d')}_" for day in days]
+
+# Binários disponíveis: os do diretório local e, com PG_BINARY_PREFIX, os do bucket nos
+# prefixos dos dias dos logs (não o store remoto inteiro)
+# Retorna (nomes locais, {nome do binário: ObjectSummary no bucket})
+def available_binaries(bucket, namespace, local_dir, remote_prefix, objects):
+    local = {name for name in os.listdir(local_dir) if name.endswith(".bin")}
+    remote = {}
+    if remote_prefix and objects:
+        prefixes = binary_prefixes(remote_prefix, objects)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(prefixes), DOWNLOAD_WORKERS))) as executor:
+            for listed in executor.map(lambda p: list_objects(bucket, namespace, p), prefixes):
+                for obj in listed:
+                    name = os.path.basename(obj.name)
+                    if name.endswith(".bin"):
+                        remote[name] = obj
+    return local, remote
+
+# Binários de versões anteriores (outro ETag) de um log recém-convertido
+def superseded_binaries(obj, names):
+    current = binary_name(obj)
+    base = os.path.basename(obj.name) + "."
+    return [name for name in names if name != current and name.startswith(base)]
+
+# Remove os binários substituídos do diretório local e do bucket
+def remove_superseded(bucket, namespace, local_dir, local, remote, converted):
+    removed = 0
+    for obj in converted:
+        for name in superseded_binaries(obj, local):
+            os.remove(os.path.join(local_dir, name))
+            removed += 1
+        for name in superseded_binaries(obj, remote):
+            get_client().delete_object(namespace, bucket, remote[name].name)
+            removed += 1
+    if removed:
+        print(f"[*] {removed} binário(s) de versões anteriores dos logs removido(s)")
+
+# Converte um log no formato binário do pgbadger (gz/extract: a partir do arquivo local,
+# stream: direto do Object Storage para o stdin do pgbadger)
+def parse_to_binary(bucket, namespace, obj, local_path, bin_path):
+    if local_path is None:
+        run_pgbadger_streaming(bucket, namespace, [obj], bin_path, quiet=True)
+    else:
+        subprocess.run(pgbadger_command([local_path], bin_path, jobs=1), check=True, stdout=subprocess.DEVNULL)
+    debug(f"Binário gerado: {bin_path}")
+    return bin_path
+
+# Downloads simultâneos e jobs do pgbadger de um ambiente (chaves opcionais do ENVIRONMENTS)
+def env_limits(cfg):
+    return cfg.get("download_workers", DOWNLOAD_WORKERS), cfg.get("jobs", JOBS)
+
+# Gera o relatório no modo incremental: converte só os logs novos (até JOBS ao mesmo tempo),
+# reaproveita os binários já existentes e junta tudo no relatório final
+def run_incremental(cfg, objects, output_dir, unified_output):
+    workers, jobs = env_limits(cfg)
+    local_dir = os.path.join(BINARY_DIR, cfg["name"])
+    remote_prefix = f"{BINARY_PREFIX.rstrip('/')}/{cfg['name']}/" if BINARY_PREFIX else ""
+    os.makedirs(local_dir, exist_ok=True)
+
+    local, remote = available_binaries(cfg["bucket"], cfg["namespace"], local_dir, remote_prefix, objects)
+    new_objects = [obj for obj in objects if binary_name(obj) not in local and binary_name(obj) not in remote]
+    print(f"[*] Incremental: {len(objects) - len(new_objects)} log(s) já convertido(s), "
+          f"{len(new_objects)} novo(s) para o pgbadger ler")
+
+    # Binários que existem só no bucket são baixados para o diretório local
+    remote_only = [remote[binary_name(obj)] for obj in objects
+                   if binary_name(obj) in remote and binary_name(obj) not in local]
+    if remote_only:
+        download_objects(cfg["bucket"], cfg["namespace"], remote_only, local_dir, workers)
+
+    start_timer = time.time()
+    if new_objects:
+        # Nos modos gz/extract os logs novos são baixados antes; no modo stream vão direto ao pgbadger
+        local_paths = [None] * len(new_objects)
+        if LOG_MODE != "stream":
+            local_paths = download_objects(cfg["bucket"], cfg["namespace"], new_objects, output_dir, workers)
+            if LOG_MODE == "extract":
+                local_paths = [extract_gz(path) for path in local_paths]
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [executor.submit(parse_to_binary, cfg["bucket"], cfg["namespace"], obj, path,
+                                       os.path.join(local_dir, binary_name(obj)))
+                       for obj, path in zip(new_objects, local_paths)]
+            new_binaries = [future.result() for future in futures]
+        print(f"[*] {len(new_binaries)} log(s) convertido(s) em {time.time() - start_timer:.2f}s "
+              f"({min(jobs, len(new_binaries))} processo(s) do pgbadger em paralelo)")
+
+        if remote_prefix:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda path: upload_binary(cfg["bucket"], cfg["namespace"], path, remote_prefix),
+                                  new_binaries))
+            print(f"[*] {len(new_binaries)} binário(s) enviado(s) para {remote_prefix}")
+
+        # Só depois que o binário novo existe (e foi enviado) os das versões anteriores saem
+        remove_superseded(cfg["bucket"], cfg["namespace"], local_dir, local, remote, new_objects)
+
+    # Relatório a partir dos binários de todos os logs do intervalo, em ordem cronológica
+    binaries = [os.path.join(local_dir, binary_name(obj)) for obj in objects]
+    pgbadger_cmd = pgbadger_command(binaries, unified_output, jobs)
+    print(f"[*] Executando pgbadger com {len(binaries)} binário(s)")
+    print_command(pgbadger_cmd)
+    subprocess.run(pgbadger_cmd, check=True)
+
+# Envia um binário para o bucket (store remoto do modo incremental)
+def upload_binary(bucket, namespace, path, remote_prefix):
+    with open(path, "rb") as f:
+        get_client().put_object(namespace, bucket, remote_prefix + os.path.basename(path), f)
+
 # Executa o pgbadger em um log único (não usado no final, mas útil para debug/testes isolados)
 def run_pgbadger(log_path, output_dir):
     os.makedirs(output_dir, exist_ok=True)
@@ -118,56 +497,104 @@ def run_pgbadger(log_path, output_dir):
     subprocess.run(["pgbadger", log_path, "-o", out_html], check=True)
     return out_html
 
-# Função principal
-def main():
-    # Lê o ambiente e intervalo de tempo a partir das variáveis de ambiente
-    env_key = os.environ["PG_ENV"]
-    start = parse_datetime(os.environ["PG_START"])
-    end = parse_datetime(os.environ["PG_END"])
+# Chaves dos ambientes em PG_ENV: uma chave, uma lista separada por vírgulas ou "all"
+def selected_environments(value):
+    if value.strip().lower() == "all":
+        return list(ENVIRONMENTS)
+    keys = [key.strip() for key in value.split(",") if key.strip()]
+    unknown = [key for key in keys if key not in ENVIRONMENTS]
+    if not keys or unknown:
+        raise ValueError(f"PG_ENV inválido: {value} (ambientes: {', '.join(ENVIRONMENTS)} ou all)")
+    return keys
 
-    # Carrega as configurações do ambiente selecionado
-    cfg = ENVIRONMENTS[env_key]
+# Gera o relatório de um ambiente; retorna o número de logs do intervalo
+def process_environment(cfg, start, end):
+    workers, jobs = env_limits(cfg)
     prefix = f"{cfg['folder']}/{cfg['subfolder']}/"
-    output_dir = "/tmp/pgbadger-output"
+    output_dir = os.path.join(OUTPUT_DIR, cfg["name"])
 
     # Informações iniciais
     print(f"[*] Ambiente: {cfg['name']}")
-    print(f"[*] Intervalo: {start.strftime('%d/%m/%Y %H:%M')} até {end.strftime('%H:%M')} (UTC)")
 
     # Busca os objetos dentro do intervalo de tempo
     objects = get_objects_by_range(cfg["bucket"], cfg["namespace"], prefix, start, end)
-    print(f"[*] {len(objects)} arquivo(s) encontrado(s) no intervalo especificado.")
+    print(f"[*] {cfg['name']}: {len(objects)} arquivo(s) encontrado(s) no intervalo especificado.")
     if not objects:
-        print("[!] Nenhum log encontrado no intervalo.")
-        return
+        print(f"[!] {cfg['name']}: nenhum log encontrado no intervalo.")
+        return 0
 
-    # Faz download e extração dos logs
-    log_files = []
-    for obj in objects:
-        gz = download_object(cfg["bucket"], cfg["namespace"], obj, output_dir)
-        log = extract_gz(gz)
-        if log.endswith(".csv"):
-            log_files.append(log)
-
-    # Monta comando pgbadger unificado com todos os arquivos
-    unified_output = os.path.join(output_dir, f"{cfg['name']}.html")
-    pgbadger_cmd = [
-        "pgbadger",
-        "--prefix", "%t [%p]: [%l-1] user=%u,db=%d,app=%a,client=%h",
-        *log_files,
-        "-o", unified_output
-    ]
-    print("[*] Executando pgbadger com os seguintes arquivos:")
-    for log_file in log_files:
-        print(f"  - {log_file}")
-    print("[*] Comando completo:")
-    print("pgbadger \\")
-    print(f"  --prefix \"{pgbadger_cmd[2]}\" \\")
-    for log_file in log_files:
-        print(f"  {log_file} \\")
-    print(f"  -o {unified_output}")
-    subprocess.run(pgbadger_cmd, check=True)
+    os.makedirs(output_dir, exist_ok=True)
+    unified_output = os.path.join(OUTPUT_DIR, f"{cfg['name']}.html")
+
+    if INCREMENTAL:
+        # Só os logs ainda não convertidos em binário são lidos pelo pgbadger
+        run_incremental(cfg, objects, output_dir, unified_output)
+    elif LOG_MODE == "stream":
+        # Logs descomprimidos direto no stdin do pgbadger, sem arquivos locais
+        print(f"[*] Executando pgbadger com {len(objects)} arquivo(s) via stdin (PG_LOG_MODE=stream)")
+        run_pgbadger_streaming(cfg["bucket"], cfg["namespace"], objects, unified_output)
+    else:
+        # Faz download (em paralelo) dos logs; no modo extract eles são descompactados em disco
+        log_files = []
+        for gz in download_objects(cfg["bucket"], cfg["namespace"], objects, output_dir, workers):
+            if LOG_MODE == "extract":
+                log = extract_gz(gz)
+                if log.endswith(".csv"):
+                    log_files.append(log)
+            elif gz.endswith(".csv.gz"):
+                log_files.append(gz)  # o pgbadger descomprime o .gz sozinho
+
+        # Monta comando pgbadger unificado com todos os arquivos
+        pgbadger_cmd = pgbadger_command(log_files, unified_output, jobs)
+        print("[*] Executando pgbadger com os seguintes arquivos:")
+        for log_file in log_files:
+            print(f"  - {log_file}")
+        print_command(pgbadger_cmd)
+        subprocess.run(pgbadger_cmd, check=True)
     print(f"[✓] Relatório unificado gerado: {unified_output}")
+    return len(objects)
+
+# Processa um ambiente medindo a duração; a falha de um ambiente não interrompe os demais
+def timed_environment(cfg, start, end):
+    start_timer = time.time()
+    try:
+        return cfg, process_environment(cfg, start, end), time.time() - start_timer, None
+    except Exception as e:
+        print(f"[!] {cfg['name']}: falha ao gerar o relatório: {e}")
+        return cfg, 0, time.time() - start_timer, e
+
+# Função principal
+def main():
+    if LOG_MODE not in LOG_MODES:
+        raise ValueError(f"PG_LOG_MODE inválido: {LOG_MODE} (use {', '.join(LOG_MODES)})")
+
+    # Lê os ambientes e intervalo de tempo a partir das variáveis de ambiente
+    envs = [ENVIRONMENTS[key] for key in selected_environments(os.environ["PG_ENV"])]
+    start = parse_datetime(os.environ["PG_START"])
+    end = parse_datetime(os.environ["PG_END"])
+    print(f"[*] Intervalo: {start.strftime('%d/%m/%Y %H:%M')} até {end.strftime('%H:%M')} (UTC)")
+
+    # Um cliente (e um pool de conexões) para todos os ambientes, dimensionado para os
+    # downloads simultâneos dos ambientes processados ao mesmo tempo
+    env_workers = max(1, min(ENV_WORKERS or len(envs), len(envs)))
+    get_client(POOL_SIZE or max(env_limits(cfg)[0] for cfg in envs) * env_workers)
+
+    if len(envs) == 1:
+        process_environment(envs[0], start, end)
+        return
+
+    print(f"[*] {len(envs)} ambiente(s), {env_workers} processado(s) ao mesmo tempo")
+    start_timer = time.time()
+    with ThreadPoolExecutor(max_workers=env_workers) as executor:
+        results = list(executor.map(lambda cfg: timed_environment(cfg, start, end), envs))
+
+    print(f"[*] Resumo por ambiente ({time.time() - start_timer:.2f}s no total):")
+    for cfg, count, duration, error in results:
+        status = f"falha ({error})" if error else f"{count} log(s)"
+        print(f"  - {cfg['name']}: {duration:.2f}s, {status}")
+    failed = [cfg["name"] for cfg, _, _, error in results if error]
+    if failed:
+        raise SystemExit(f"[!] Falha em {len(failed)} ambiente(s): {', '.join(failed)}")
 
 
 # Ponto de entrada do script